@@ -1,5 +1,7 @@
 import pygame
-from scripts.basics.gui import Label, Button, Slider, TextBox
+from scripts.basics.gui import Label, GlyphText, Button, Slider, TextBox
+from scripts.basics.layout import Layout, Anchor, Column
+from scripts.basics.surfaces import track
 
 class Menu():
     '''
@@ -17,26 +19,48 @@ class Menu():
         self.screen = game.screen
         # Setup a new menu screen.
         self.new_screen()
+        # Subscribe to the events the menu handles.
+        self.game.event_router.subscribe(pygame.QUIT, self.quit)
+        # The text box only receives typed text and keys while it is selected.
+        self.game.event_router.subscribe([pygame.TEXTINPUT, pygame.KEYDOWN], self.type_text, focus=lambda: self.text_box.pressed)
     
     def new_screen(self):
         '''
         Creates a new surface for the menu and initializes menu components.
         '''
         # Create a menu surface with the same size as the game screen.
-        self.window_surface = pygame.Surface((self.screen.WIDTH, self.screen.HEIGHT))
+        self.window_surface = track(pygame.Surface((self.screen.WIDTH, self.screen.HEIGHT)))
 
         # Create text and button elements for the menu.
+        # Element positions are resolved by the layout below, so they start at the origin.
         self.text = Label(self.window_surface)
-        self.button1 = Button(self.window_surface, self.screen.aspect_ratio, (150, 150))
-        self.button2 = Button(self.window_surface, self.screen.aspect_ratio, (150, 300), box_border_radius=20, text_color=(0,0,255), text_hover_color=(255,0,0))
-        self.button3 = Button(self.window_surface, self.screen.aspect_ratio, (150, 450), shadow_size=(6,6))
-        self.button4 = Button(self.window_surface, self.screen.aspect_ratio, (500, 600), border=True, border_thickness=2, box_transparency=-1, text_hover_color=(128,128,128))
-        self.button5 = Button(self.window_surface, self.screen.aspect_ratio, (500, 150), border=True, border_thickness=2, box_border_radius=20)
-        self.button6 = Button(self.window_surface, self.screen.aspect_ratio, (500, 300), box_border_radius=20, shadow_size=(6,6), border=True, border_thickness=2)
-        self.button7 = Button(self.window_surface, self.screen.aspect_ratio, (500, 450), box_border_radius=20, shadow_size=(6,6), text_color=(255,255,255), text_hover_color=(255,255,255), box_color=(20,20,20), box_hover_color=(0,0,0), shadow_color=(100,100,100))
-        self.button8 = Button(self.window_surface, self.screen.aspect_ratio, (1200, 30), size=(150, 50), text_font_size=50, box_border_radius=20, shadow_size=(6,6), border=True, border_thickness=2)
-        self.slider = Slider(self.window_surface, self.screen.aspect_ratio, (850, 175), slider_value=self.settings.audio_settings['main_volume'])
-        self.text_box = TextBox(self.window_surface, self.screen.aspect_ratio, (500, 680), size=(500, 50), border=True, border_thickness=2, box_transparency=-1, box_border_radius=20)
+        # Atlas-based text for values that change every frame (FPS, volume).
+        self.hud_text = GlyphText(self.window_surface)
+        self.button1 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0))
+        self.button2 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), box_border_radius=20, text_color=(0,0,255), text_hover_color=(255,0,0))
+        self.button3 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), shadow_size=(6,6))
+        self.button4 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), border=True, border_thickness=2, box_transparency=-1, text_hover_color=(128,128,128))
+        self.button5 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), border=True, border_thickness=2, box_border_radius=20)
+        self.button6 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), box_border_radius=20, shadow_size=(6,6), border=True, border_thickness=2)
+        self.button7 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), box_border_radius=20, shadow_size=(6,6), text_color=(255,255,255), text_hover_color=(255,255,255), box_color=(20,20,20), box_hover_color=(0,0,0), shadow_color=(100,100,100))
+        self.button8 = Button(self.window_surface, self.screen.aspect_ratio, (0, 0), size=(150, 50), text_font_size=50, box_border_radius=20, shadow_size=(6,6), border=True, border_thickness=2)
+        self.slider = Slider(self.window_surface, self.screen.aspect_ratio, (0, 0), slider_value=self.settings.audio_settings['main_volume'])
+        self.text_box = TextBox(self.window_surface, self.screen.aspect_ratio, (0, 0), size=(500, 50), border=True, border_thickness=2, box_transparency=-1, box_border_radius=20)
+
+        # Describe where each element goes on the menu surface.
+        self.layout = Layout((self.screen.WIDTH, self.screen.HEIGHT),
+                             # Resolution buttons.
+                             Anchor(Column(self.button1, self.button2, self.button3, spacing=50), 'topleft', offset=(150, 100), pivot='midtop'),
+                             # Language, VSync and FPS buttons.
+                             Anchor(Column(self.button5, self.button6, self.button7, self.button4, spacing=50), 'topleft', offset=(500, 100), pivot='midtop'),
+                             # Exit button at the top-right corner.
+                             Anchor(self.button8, 'topright', offset=(-5, 5)),
+                             # Volume slider.
+                             Anchor(self.slider, 'topleft', offset=(850, 175), pivot='center'),
+                             # Text box near the bottom of the screen.
+                             Anchor(self.text_box, 'midbottom', offset=(-140, -15)))
+        # Compute the geometry of every element for the current resolution.
+        self.layout.resolve(self.screen.aspect_ratio)
 
     def run(self):
         '''
@@ -53,19 +77,30 @@ class Menu():
     
     def update(self):
         '''
-        Update menu components (currently unused).
+        Update menu components.
         '''
-        pass
+        # Recompute element geometry only if the resolution changed since the last frame.
+        self.layout.resolve(self.screen.aspect_ratio)
+        # Pre-render a few queued texts of the active and next language.
+        self.settings.localization.warm()
 
     def events(self):
         '''
-        Handle pygame events, including quitting the game.
+        Handle pygame events, delivering each one only to the handlers subscribed to it.
+        '''
+        self.game.event_router.dispatch()
+
+    def quit(self, event):
+        '''
+        Quit the game when the window is closed.
+        '''
+        self.game.running = False
+
+    def type_text(self, event):
+        '''
+        Send typed text or a key to the text box.
         '''
-        for event in pygame.event.get():
-            # Quit the game if the window is closed.
-            if event.type == pygame.QUIT:
-                self.game.running = False
-            self.text_box.event(event)
+        self.text_box.event(event)
         
     def draw(self):
         self.text_box.draw()
@@ -85,11 +120,12 @@ class Menu():
         # Display FPS status if enabled.
         if self.settings.video_settings['show_fps']:
             status = 'ON'
-            self.text.write('FPS: ', (0, 550))
-            self.text.write(str(int(self.screen.clock.get_fps())), (170, 550))
+            self.hud_text.write('FPS: ', (0, 550))
+            self.hud_text.write(int(self.screen.clock.get_fps()), (170, 550))
         else:
             status = 'OFF'
-        self.button4.draw_button(f'{self.settings.game_texts['show_fps']} - {status}')
+        # The label is cached for each status, so it is not rendered again every frame.
+        self.button4.draw_button(self.settings.localization.render('show_fps', self.button4.text, f' - {status}'))
 
         # English language button.
         self.button5.draw_button('English')
@@ -104,14 +140,14 @@ class Menu():
         self.button7.draw_button(f'VSync - {status}')
 
         # Draw the title text at the top-center of the screen.
-        self.text.write(self.settings.game_texts['title'], (int(self.screen.WIDTH/2), 0), center_w=True)
+        self.text.write(self.settings.localization.render('title', self.text), (int(self.screen.WIDTH/2), 0), center_w=True)
 
         # Exit button.
-        self.button8.draw_button(self.settings.game_texts['exit'])
+        self.button8.draw_button(self.settings.localization.render('exit', self.button8.text))
         # Draw volume slider.
         self.slider.draw_slider()
         # Display current volume.
-        self.text.write(self.settings.audio_settings['main_volume'], (850, 100), center_w=True)
+        self.hud_text.write(self.settings.audio_settings['main_volume'], (850, 100), center_w=True)
 
     def inputs(self):
         '''
@@ -120,13 +156,10 @@ class Menu():
         # Handle resolution buttons.
         if self.button1.click_button():
             self.screen.resize_screen(1600, 900, self.settings.video_settings['vsync'])
-            self.new_screen()
         if self.button2.click_button():
             self.screen.resize_screen(1280, 720, self.settings.video_settings['vsync'])
-            self.new_screen()
         if self.button3.click_button():
             self.screen.resize_screen(720, 480, self.settings.video_settings['vsync'])
-            self.new_screen()
         
         # Handle FPS toggle button.
         if self.button4.click_button():
@@ -150,6 +183,8 @@ class Menu():
         # Handle slider interaction.
         if self.slider.click_slider():
             self.settings.set_settings('audio', 'main_volume', self.slider.slider_value)
+            # Apply the new volume to the music and sounds that are playing.
+            self.game.audio.set_volume(self.slider.slider_value)
         
         # Handle text_box interaction.
         self.text_box.click()
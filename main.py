@@ -1,28 +1,75 @@
 import pygame
 from scripts.basics.screen import Screen
 from scripts.basics.settings import Settings
-from canvas.menu import Menu
+from scripts.basics.controls import Controls
+from scripts.basics.events import EventRouter
+from scripts.basics.audio import Audio
+from scripts.basics.game_data import GameData
+from scripts.basics.snapshot import Snapshots
+from scripts.basics.startup import StartupTrace
+from scripts.basics.surfaces import surfaces
 
 class Main():
     '''
     Manages the main loop and game states for the application.
     '''
-    def __init__(self):
+    def __init__(self, config_dir=None):
         '''
         Initializes the game by setting up required components like settings, screen, and menu.
+
+        Parameters:
+        - config_dir: Directory with the settings and save files (defaults to the 'config' directory).
         '''
-        # Initialize Pygame.
-        pygame.init()
+        # Record how long each startup phase takes.
+        self.startup = StartupTrace()
+        # Initialize only the Pygame modules needed for the first frame; the mixer is initialized later by Audio.
+        self.startup.phase('pygame')
+        pygame.display.init()
+        pygame.font.init()
         # Create an instance of the Settings class to manage configuration.
-        self.settings = Settings()
+        self.startup.phase('settings')
+        self.settings = Settings(config_dir)
         # Create an instance of the Screen class, passing the settings to configure the display.
+        self.startup.phase('display')
         self.screen = Screen(self.settings)
+        # Show a first frame right away, before the heavier setup.
+        self.startup.phase('first frame')
+        self.screen.display_surf.fill((255,255,255))
+        self.screen.screen_update()
+        pygame.event.pump()
+        self.startup.mark_first_frame()
+        # Create an instance of the Controls class, compiling the key bindings into action tables.
+        self.startup.phase('controls')
+        self.controls = Controls(self.settings)
+        # Create the event router; it blocks every event type until a handler subscribes to it.
+        self.event_router = EventRouter()
+        # Keep the game actions updated from the keyboard.
+        self.event_router.subscribe([pygame.KEYDOWN, pygame.KEYUP, pygame.WINDOWFOCUSLOST], self.controls.event)
+        # Create an instance of the Audio class, which initializes the mixer and applies the saved volume.
+        self.startup.phase('audio')
+        self.audio = Audio(self.settings)
+        # Create an instance of the GameData class, which saves game statistics in the background.
+        self.startup.phase('game data')
+        self.game_data = GameData(self.settings)
+        self.game_data.increment('times_played')
+        # Create an instance of the Snapshots class, which saves the registered game state (quick-save, checkpoints).
+        self.snapshots = Snapshots(self.settings)
+        # Track surfaces (memory, slow formats, per-frame allocations), if enabled in the settings.
+        if self.settings.debug_settings['surface_tracking']:
+            surfaces.enable()
         # A flag to control the main game loop.
         self.running = True
         # Set the initial game state to 'menu'.
         self.game_state = 'menu'
         # Create an instance of the Menu class, passing the current Main instance for access to shared resources.
+        # The menu (and the GUI module) is only imported here, after the first frame.
+        self.startup.phase('menu')
+        from canvas.menu import Menu
         self.menu = Menu(self)
+        self.startup.end()
+        # Print the startup timeline, if enabled in the settings.
+        if self.settings.debug_settings['startup_trace']:
+            print(self.startup.report())
     
     def run(self):
         '''
@@ -30,15 +77,35 @@ class Main():
         Continuously updates the game state and renders the screen until the game is exited.
         '''
         while self.running:
-            # Calculate the time elapsed since the last frame (delta time) for consistent animations and logic.
-            self.screen.delta_time()
-            # Handle user inputs and manage transitions between game states.
-            self.controller()
-            # Refresh the screen to reflect changes.
-            self.screen.screen_update()
+            self.step()
+        # Write the remaining game data and snapshots before exiting.
+        self.game_data.close()
+        self.snapshots.close()
         # Exit the game and clean up resources.
         pygame.quit()
 
+    def step(self):
+        '''
+        Runs a single frame of the game.
+        '''
+        # Calculate the time elapsed since the last frame (delta time) for consistent animations and logic.
+        self.screen.delta_time()
+        # Start a new frame of input actions.
+        self.controls.update()
+        # Handle user inputs and manage transitions between game states.
+        self.controller()
+        # Quick-save (written in the background) and quick-load.
+        if self.controls.was_pressed('quick_save'):
+            self.snapshots.save('quicksave')
+        if self.controls.was_pressed('quick_load'):
+            self.snapshots.load('quicksave')
+        # Refresh the screen to reflect changes.
+        self.screen.screen_update()
+        # Periodically write the changed game data (on a background thread).
+        self.game_data.update(self.screen.dt)
+        # Close the frame for the surface tracking (does nothing if disabled).
+        surfaces.next_frame()
+
     def controller(self):
         '''
         Manages the game state and directs control to the appropriate handler for the current state.
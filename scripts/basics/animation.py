@@ -0,0 +1,232 @@
+import numpy as np
+
+class AnimationClip:
+    '''
+    A shared animation (e.g., the frames from Assets.animated_sprites) played by many sprites.
+    The clip advances the phase of every instance in one NumPy step; only the sprites whose
+    frame changed have their image replaced.
+    '''
+    def __init__(self, frames, fps=12, loop=True, capacity=64):
+        '''
+        Initializes the AnimationClip class.
+
+        Parameters:
+        - frames: List of surfaces, in order;
+        - fps: Frames per second at speed 1;
+        - loop: Whether the animation restarts after the last frame (otherwise it stops on it);
+        - capacity: Initial number of instances the arrays can hold (they grow as needed).
+
+        Attributes:
+        - sprites: The sprite of each instance slot (None for free slots);
+        - phase: Frames each instance has advanced since frame 0, with the fraction of the current frame;
+        - speed: Playback speed of each instance (0 pauses it);
+        - total: Number of frames each instance has advanced since it started (not wrapped);
+        - frame: Current frame of each instance;
+        - events: Callbacks by frame, called as callback(sprite, frame) when an instance reaches that frame.
+        '''
+        self.frames = list(frames)
+        self.fps = fps
+        self.loop = loop
+        self.sprites = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.active = np.zeros(capacity, dtype=bool)
+        self.phase = np.zeros(capacity, dtype=np.float64)
+        self.speed = np.ones(capacity, dtype=np.float64)
+        self.total = np.zeros(capacity, dtype=np.int64)
+        self.frame = np.zeros(capacity, dtype=np.int64)
+        self.events = {}
+        self.changed = 0
+
+    def on(self, frame, callback):
+        '''
+        Calls a function whenever an instance reaches a frame (e.g., a footstep sound or a hit).
+
+        Parameters:
+        - frame: The frame index;
+        - callback: Function called as callback(sprite, frame).
+        '''
+        self.events.setdefault(frame, []).append(callback)
+
+    def grow(self):
+        '''
+        Doubles the number of instance slots.
+        '''
+        capacity = len(self.sprites)
+        self.sprites.extend([None] * capacity)
+        self.free.extend(range(capacity * 2 - 1, capacity - 1, -1))
+        self.active = np.concatenate((self.active, np.zeros(capacity, dtype=bool)))
+        self.phase = np.concatenate((self.phase, np.zeros(capacity)))
+        self.speed = np.concatenate((self.speed, np.ones(capacity)))
+        self.total = np.concatenate((self.total, np.zeros(capacity, dtype=np.int64)))
+        self.frame = np.concatenate((self.frame, np.zeros(capacity, dtype=np.int64)))
+
+    def play(self, sprite, speed=1.0, start_frame=0):
+        '''
+        Starts animating a sprite, sets its image to the starting frame and calls that frame's events.
+
+        Parameters:
+        - sprite: The sprite whose image is animated;
+        - speed: Playback speed (1 is the clip's fps, 0 starts paused);
+        - start_frame: The frame to start on (e.g., random, so a crowd does not move in sync).
+
+        Returns:
+        - The instance slot, used by stop and set_speed.
+        '''
+        if not self.free:
+            self.grow()
+        slot = self.free.pop()
+        self.sprites[slot] = sprite
+        self.active[slot] = True
+        self.speed[slot] = speed
+        self.phase[slot] = start_frame
+        self.total[slot] = start_frame
+        self.frame[slot] = start_frame
+        sprite.image = self.frames[start_frame]
+        # The instance reaches its first frame right away.
+        for callback in self.events.get(start_frame, ()):
+            callback(sprite, start_frame)
+        return slot
+
+    def stop(self, slot):
+        '''
+        Stops an instance; its sprite keeps the current image.
+
+        Parameters:
+        - slot: The slot returned by play.
+        '''
+        self.sprites[slot] = None
+        self.active[slot] = False
+        self.free.append(slot)
+
+    def set_speed(self, slot, speed):
+        '''
+        Changes the playback speed of an instance without jumping to another frame.
+
+        Parameters:
+        - slot: The slot returned by play;
+        - speed: The new playback speed (0 pauses the instance).
+        '''
+        self.speed[slot] = speed
+
+    def update(self, dt):
+        '''
+        Advances every instance and updates the image of those whose frame changed.
+
+        Parameters:
+        - dt: Delta time in seconds.
+        '''
+        length = len(self.frames)
+        # Advance every instance, in a single batch.
+        self.phase += self.speed * (dt * self.fps)
+        total = np.floor(self.phase).astype(np.int64)
+        if self.loop:
+            frame = total % length
+        else:
+            total = np.minimum(total, length - 1)
+            frame = total
+        changed = np.flatnonzero(self.active & (frame != self.frame))
+        self.changed = len(changed)
+
+        # Only the instances whose frame changed are touched from Python.
+        frames = self.frames
+        sprites = self.sprites
+        for slot, index in zip(changed.tolist(), frame[changed].tolist()):
+            sprites[slot].image = frames[index]
+
+        # Call the frame events of the instances that reached (or skipped past) their frame.
+        for event_frame, callbacks in self.events.items():
+            if self.loop:
+                reached = (total - event_frame) // length > (self.total - event_frame) // length
+            else:
+                reached = (self.total < event_frame) & (total >= event_frame)
+            for slot in np.flatnonzero(reached & self.active).tolist():
+                for callback in callbacks:
+                    callback(sprites[slot], event_frame)
+
+        self.total = total
+        self.frame = frame
+
+class Animations:
+    '''
+    Keeps the animation clips by name and the clip each sprite is playing.
+    Call update once per frame with the delta time.
+    '''
+    def __init__(self):
+        '''
+        Initializes the Animations class.
+
+        Attributes:
+        - clips: Animation clips, by name;
+        - playing: The (clip, slot) each sprite is playing.
+        '''
+        self.clips = {}
+        self.playing = {}
+
+    def add_clip(self, name, frames, fps=12, loop=True):
+        '''
+        Creates a clip shared by every sprite that plays it.
+
+        Parameters:
+        - name: The clip name (e.g., 'player_walk');
+        - frames: List of surfaces (e.g., from Assets.animated_sprites);
+        - fps: Frames per second at speed 1;
+        - loop: Whether the animation restarts after the last frame.
+
+        Returns:
+        - The AnimationClip, to add frame events with on().
+        '''
+        clip = self.clips[name] = AnimationClip(frames, fps, loop)
+        return clip
+
+    def play(self, sprite, name, speed=1.0, start_frame=0):
+        '''
+        Plays a clip on a sprite, replacing the clip it was playing.
+
+        Parameters:
+        - sprite: The sprite whose image is animated;
+        - name: The clip name;
+        - speed: Playback speed (1 is the clip's fps);
+        - start_frame: The frame to start on.
+        '''
+        self.stop(sprite)
+        clip = self.clips[name]
+        self.playing[sprite] = (clip, clip.play(sprite, speed, start_frame))
+
+    def stop(self, sprite):
+        '''
+        Stops the animation of a sprite (must be called when the sprite is killed).
+
+        Parameters:
+        - sprite: The sprite to stop.
+        '''
+        playing = self.playing.pop(sprite, None)
+        if playing:
+            playing[0].stop(playing[1])
+
+    def set_speed(self, sprite, speed):
+        '''
+        Changes the playback speed of a sprite's animation.
+
+        Parameters:
+        - sprite: The animated sprite;
+        - speed: The new playback speed (0 pauses it).
+        '''
+        clip, slot = self.playing[sprite]
+        clip.set_speed(slot, speed)
+
+    def update(self, dt):
+        '''
+        Advances every clip. Called once per frame.
+
+        Parameters:
+        - dt: Delta time in seconds.
+        '''
+        for clip in self.clips.values():
+            clip.update(dt)
+
+    def stats(self):
+        '''
+        Returns:
+        - A dictionary with the number of animated sprites and how many changed frame in the last update.
+        '''
+        return {'instances': len(self.playing), 'changed': sum(clip.changed for clip in self.clips.values())}
@@ -1,5 +1,6 @@
 import pygame
 import os
+from scripts.basics.surfaces import track
 
 class Assets:
     def __init__(self, path):
@@ -26,7 +27,7 @@ class Assets:
         '''
         # Load the image sprite.png from the images directory.
         # The convert_alpha() method optimizes the image for transparency and faster blitting.
-        self.sprite = pygame.image.load(os.path.join(self.images_dir, 'sprite.png')).convert_alpha()
+        self.sprite = track(pygame.image.load(os.path.join(self.images_dir, 'sprite.png')).convert_alpha())
     
     def groups(self):
         '''
@@ -50,13 +51,13 @@ class Assets:
         Functionality:
         - Iterates through the sprite sheet based on the given matrix.
         - Extracts individual frames using `subsurface()`.
-        - Returns a 
+        - Returns a list of frames, which can be played by an animation clip (see scripts/basics/animation.py).
         '''
         images_frames = []
         count = 1
         for y in range (matrix[0]):
             for x in range(matrix[1]):
                 if count <= frames:
-                    images_frames.append(image.subsurface(pygame.Rect(x * image_size[0], y * image_size[1], image_size[0], image_size[1])))
+                    images_frames.append(track(image.subsurface(pygame.Rect(x * image_size[0], y * image_size[1], image_size[0], image_size[1]))))
                     count += 1
         return images_frames
@@ -0,0 +1,154 @@
+import pygame
+from collections import OrderedDict
+import os
+
+class Audio:
+    '''
+    Manages sound effects and music.
+    Decoded sounds are cached with LRU eviction by memory size, music is streamed,
+    and sound effects share a fixed number of channels allocated by priority.
+    '''
+    def __init__(self, settings, max_memory=32 * 1024 * 1024, voices=16):
+        '''
+        Initializes the Audio class.
+
+        Parameters:
+        - settings: An instance of the Settings class, used for the base path and the volume;
+        - max_memory: Maximum memory in bytes used by decoded sounds;
+        - voices: Maximum number of sound effects playing at the same time.
+
+        Attributes:
+        - sounds_dir: The 'sounds' directory, where sound effects and music are located;
+        - cache: Decoded sounds, from least to most recently used, as name: (sound, size);
+        - memory: Memory in bytes currently used by the cache;
+        - channels: The mixer channels, one per voice.
+        '''
+        self.settings = settings
+        self.sounds_dir = os.path.join(settings.path, 'sounds')
+        self.max_memory = max_memory
+        # Initialize the mixer, if it is not initialized yet.
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.set_num_channels(voices)
+        self.cache = OrderedDict()
+        self.memory = 0
+        self.channels = [pygame.mixer.Channel(index) for index in range(voices)]
+        # Priority and relative volume of the sound playing on each channel.
+        self.priorities = [0] * voices
+        self.volumes = [1.0] * voices
+        self.music_volume = 1.0
+        self.set_volume(settings.audio_settings['main_volume'])
+
+    def sound_size(self, sound):
+        '''
+        Calculates the memory used by a decoded sound, without copying its samples.
+
+        Returns:
+        - The size in bytes.
+        '''
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def load(self, name):
+        '''
+        Returns a decoded sound, loading it only if it is not in the cache.
+        Least recently used sounds are evicted to keep the cache under max_memory.
+
+        Parameters:
+        - name: The file name inside the 'sounds' directory.
+
+        Returns:
+        - The pygame Sound object.
+        '''
+        if name in self.cache:
+            # Mark the sound as the most recently used.
+            self.cache.move_to_end(name)
+            return self.cache[name][0]
+        sound = pygame.mixer.Sound(os.path.join(self.sounds_dir, name))
+        size = self.sound_size(sound)
+        # Evict the least recently used sounds until the new one fits.
+        while self.cache and self.memory + size > self.max_memory:
+            _, (_, evicted_size) = self.cache.popitem(last=False)
+            self.memory -= evicted_size
+        self.cache[name] = (sound, size)
+        self.memory += size
+        return sound
+
+    def play(self, name, priority=0, volume=1.0, loops=0):
+        '''
+        Plays a sound effect on a free channel.
+        If every channel is busy, the sound with the lowest priority is stopped,
+        unless its priority is higher than the new sound's.
+
+        Parameters:
+        - name: The file name inside the 'sounds' directory;
+        - priority: Higher values are kept when there are no free channels;
+        - volume: Volume of this sound, from 0 to 1, relative to the main volume;
+        - loops: Number of extra repetitions (-1 to loop forever).
+
+        Returns:
+        - The channel playing the sound, or None if it was dropped.
+        '''
+        sound = self.load(name)
+        index = self.find_channel(priority)
+        if index is None:
+            return None
+        channel = self.channels[index]
+        self.priorities[index] = priority
+        self.volumes[index] = volume
+        channel.play(sound, loops)
+        channel.set_volume(volume * self.volume)
+        return channel
+
+    def find_channel(self, priority):
+        '''
+        Returns:
+        - The index of a free channel, of the lowest priority channel if it can be stolen, or None.
+        '''
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        index = min(range(len(self.channels)), key=self.priorities.__getitem__)
+        if self.priorities[index] > priority:
+            return None
+        self.channels[index].stop()
+        return index
+
+    def play_music(self, name, loops=-1, volume=1.0, fade_ms=0):
+        '''
+        Streams a music file from disk instead of decoding it fully in memory.
+
+        Parameters:
+        - name: The file name inside the 'sounds' directory;
+        - loops: Number of extra repetitions (-1 to loop forever);
+        - volume: Music volume, from 0 to 1, relative to the main volume;
+        - fade_ms: Fade-in duration in milliseconds.
+        '''
+        pygame.mixer.music.load(os.path.join(self.sounds_dir, name))
+        self.music_volume = volume
+        pygame.mixer.music.set_volume(volume * self.volume)
+        pygame.mixer.music.play(loops, fade_ms=fade_ms)
+
+    def stop_music(self, fade_ms=0):
+        '''
+        Stops the music, optionally fading it out.
+
+        Parameters:
+        - fade_ms: Fade-out duration in milliseconds.
+        '''
+        if fade_ms:
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            pygame.mixer.music.stop()
+
+    def set_volume(self, main_volume):
+        '''
+        Applies the main volume to the music and every channel, without reloading any sound.
+
+        Parameters:
+        - main_volume: The main volume, from 0 to 100 (as stored in the settings).
+        '''
+        self.volume = main_volume / 100
+        pygame.mixer.music.set_volume(self.music_volume * self.volume)
+        for channel, volume in zip(self.channels, self.volumes):
+            channel.set_volume(volume * self.volume)
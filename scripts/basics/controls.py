@@ -0,0 +1,188 @@
+import pygame
+
+class Controls:
+    '''
+    Translates the 'keys' section of the settings into game actions.
+    Bindings are compiled once into keycode tables and bitsets, so the frame loop
+    only does dictionary lookups and bitwise operations.
+    '''
+    # Bindings of the actions the game itself uses, for settings files saved before they existed.
+    DEFAULTS = {'quick_save': 'f5', 'quick_load': 'f9'}
+
+    def __init__(self, settings):
+        '''
+        Initializes the Controls class and compiles the current bindings.
+
+        Parameters:
+        - settings: An instance of the Settings class, whose 'controls' hold the bindings.
+
+        A binding is a key name (e.g., "w", "space", "left ctrl"), a chord of key names
+        joined by '+' (e.g., "left ctrl+s"), or a list of those.
+        '''
+        self.settings = settings
+        self.compile()
+
+    def compile(self):
+        '''
+        Builds the lookup tables from the bindings. Called again only when a binding changes.
+
+        Sets:
+        - action_bits: Bit of each action in the action bitsets;
+        - key_bits: Bit of each bound keycode in the held keys bitset;
+        - key_actions: Bitset of the single-key actions triggered by each keycode;
+        - chords: List of (action bit, keys bitset, covered actions bitset) for actions that need several keys at once;
+          the covered actions are the single-key actions of the chord's keys, suppressed while the chord is held.
+        '''
+        self.bindings = {**self.DEFAULTS, **(self.settings.controls or {})}
+        self.action_bits, self.key_bits, self.key_actions, self.chords = self.build(self.bindings)
+        # Keycodes by bit, used to rebuild the action state from the held keys.
+        self.bit_keys = {bit: code for code, bit in self.key_bits.items()}
+        self.release_all()
+
+    def build(self, bindings):
+        '''
+        Builds the lookup tables of a set of bindings, without changing the current ones.
+
+        Parameters:
+        - bindings: Dictionary with the binding of each action.
+
+        Returns:
+        - A tuple (action_bits, key_bits, key_actions, chords), see compile.
+
+        Raises:
+        - ValueError: If a key name is unknown.
+        '''
+        action_bits = {}
+        key_bits = {}
+        key_actions = {}
+        chords = []
+        for index, (action, binding) in enumerate(bindings.items()):
+            action_bit = 1 << index
+            action_bits[action] = action_bit
+            for combo in binding if isinstance(binding, list) else [binding]:
+                # Give every key of the combo its own bit in the held keys bitset.
+                keys_mask = 0
+                names = combo.split('+')
+                codes = [pygame.key.key_code(name.strip()) for name in names]
+                for code in codes:
+                    if code not in key_bits:
+                        key_bits[code] = 1 << len(key_bits)
+                    keys_mask |= key_bits[code]
+                if len(names) > 1:
+                    chords.append((action_bit, keys_mask, codes))
+                else:
+                    key_actions[code] = key_actions.get(code, 0) | action_bit
+        # Once every single-key action is known, find the ones each chord covers.
+        for index, (action_bit, keys_mask, codes) in enumerate(chords):
+            covered = 0
+            for code in codes:
+                covered |= key_actions.get(code, 0)
+            chords[index] = (action_bit, keys_mask, covered)
+        return action_bits, key_bits, key_actions, chords
+
+    def release_all(self):
+        '''
+        Clears the state of every key and action (e.g., after rebinding or losing focus).
+        '''
+        self.held_keys = 0
+        self.held = 0
+        self.pressed = 0
+        self.released = 0
+
+    def rebind(self, action, binding):
+        '''
+        Changes the binding of an action, saves it and recompiles the tables.
+        The new bindings are checked first, so an invalid binding is never saved.
+
+        Parameters:
+        - action: The action name (e.g., 'shoot');
+        - binding: A key name, a chord ("left ctrl+s") or a list of those.
+
+        Raises:
+        - ValueError: If a key name is unknown (the bindings are not changed).
+        '''
+        self.build({**self.DEFAULTS, **(self.settings.controls or {}), action: binding})
+        self.settings.set_settings('keys', action, binding)
+        self.compile()
+
+    def update(self):
+        '''
+        Starts a new frame: clears the actions pressed and released during the previous frame.
+        Must be called once per frame, before the events are processed.
+        '''
+        self.pressed = 0
+        self.released = 0
+
+    def event(self, event):
+        '''
+        Updates the action state from a keyboard event.
+
+        Parameters:
+        - event: The Pygame event object.
+        '''
+        if event.type == pygame.KEYDOWN or event.type == pygame.KEYUP:
+            key_bit = self.key_bits.get(event.key)
+            # Ignore keys that are not bound to any action.
+            if key_bit is None:
+                return
+            if event.type == pygame.KEYDOWN:
+                self.held_keys |= key_bit
+            else:
+                self.held_keys &= ~key_bit
+            self.refresh()
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Key releases are not received without focus, so release everything.
+            self.held_keys = 0
+            self.refresh()
+
+    def refresh(self):
+        '''
+        Rebuilds the held actions from the held keys and records what changed this frame.
+        '''
+        held = 0
+        keys = self.held_keys
+        while keys:
+            # Take the lowest held key bit.
+            bit = keys & -keys
+            held |= self.key_actions.get(self.bit_keys[bit], 0)
+            keys ^= bit
+        chords_held = 0
+        covered = 0
+        for action_bit, keys_mask, chord_covered in self.chords:
+            if self.held_keys & keys_mask == keys_mask:
+                chords_held |= action_bit
+                covered |= chord_covered
+        # A held chord hides the actions of its own keys (Ctrl+S does not also move down with "s").
+        held = (held & ~covered) | chords_held
+        self.pressed |= held & ~self.held
+        self.released |= self.held & ~held
+        self.held = held
+
+    def is_held(self, action):
+        '''
+        Returns:
+        - True while the action's key (or chord) is held down.
+        '''
+        return bool(self.held & self.action_bits[action])
+
+    def was_pressed(self, action):
+        '''
+        Returns:
+        - True if the action started during the current frame.
+        '''
+        return bool(self.pressed & self.action_bits[action])
+
+    def was_released(self, action):
+        '''
+        Returns:
+        - True if the action stopped during the current frame.
+        '''
+        return bool(self.released & self.action_bits[action])
+
+    def snapshot(self):
+        '''
+        Returns:
+        - A tuple (held, pressed, released) with the action bitsets of the current frame,
+          which can be stored or compared cheaply (e.g., for replays).
+        '''
+        return (self.held, self.pressed, self.released)
@@ -0,0 +1,111 @@
+import pygame
+
+class EventRouter:
+    '''
+    Routes the pygame events to the handlers subscribed to their type.
+    Event types without subscribers are blocked with pygame.event.set_allowed, so SDL drops
+    them before they reach the queue. A subscription can have a focus condition (e.g., a text
+    box only receives keys while it is selected), and high-frequency events such as
+    MOUSEMOTION are coalesced into one per frame.
+    '''
+    # Window events are never blocked: SDL and pygame use them to keep the (SCALED) display in sync.
+    # TEXTINPUT is never blocked either: SDL stops generating it while it is blocked, and pygame
+    # fills KEYDOWN.unicode from it.
+    ALWAYS_ALLOWED = (pygame.TEXTINPUT, pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWSHOWN, pygame.WINDOWHIDDEN, pygame.WINDOWEXPOSED,
+                      pygame.WINDOWMOVED, pygame.WINDOWRESIZED, pygame.WINDOWSIZECHANGED, pygame.WINDOWMINIMIZED,
+                      pygame.WINDOWMAXIMIZED, pygame.WINDOWRESTORED, pygame.WINDOWDISPLAYCHANGED)
+
+    def __init__(self, coalesce=(pygame.MOUSEMOTION,)):
+        '''
+        Initializes the EventRouter class, with every event type blocked until it is subscribed.
+
+        Parameters:
+        - coalesce: Event types delivered at most once per frame (the latest event, with the 'rel' movement of the merged events added up).
+
+        Attributes:
+        - subscribers: List of (handler, focus) subscriptions, by event type;
+        - counts: Number of events received during the last frame, by event name;
+        - coalesced: Number of events merged into others during the last frame.
+        '''
+        self.coalesce = set(coalesce)
+        self.subscribers = {}
+        self.counts = {}
+        self.coalesced = 0
+        self.update_allowed()
+
+    def subscribe(self, event_types, handler, focus=None):
+        '''
+        Delivers events of one or more types to a handler.
+
+        Parameters:
+        - event_types: An event type (e.g., pygame.KEYDOWN) or a list of those;
+        - handler: Function called with each event;
+        - focus: Optional function; the handler only receives events while it returns True.
+        '''
+        for event_type in event_types if isinstance(event_types, (list, tuple, set)) else [event_types]:
+            self.subscribers.setdefault(event_type, []).append((handler, focus))
+        self.update_allowed()
+
+    def unsubscribe(self, handler):
+        '''
+        Removes every subscription of a handler (e.g., when its scene is closed).
+
+        Parameters:
+        - handler: The function passed to subscribe.
+        '''
+        for event_type in list(self.subscribers):
+            self.subscribers[event_type] = [subscription for subscription in self.subscribers[event_type] if subscription[0] != handler]
+            if not self.subscribers[event_type]:
+                del self.subscribers[event_type]
+        self.update_allowed()
+
+    def update_allowed(self):
+        '''
+        Allows only the subscribed event types (and the window and text input events) into the event queue.
+        '''
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.ALWAYS_ALLOWED) + list(self.subscribers))
+
+    def dispatch(self):
+        '''
+        Takes the events of the current frame from the queue and delivers each one to its subscribers.
+        Called once per frame.
+        '''
+        events = pygame.event.get()
+        self.counts = {}
+        for event in events:
+            name = pygame.event.event_name(event.type)
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+        # Find the last event of each coalesced type and add up the movement of the ones before it.
+        last = {}
+        moved = {}
+        self.coalesced = 0
+        for index, event in enumerate(events):
+            if event.type in self.coalesce:
+                if event.type in last:
+                    self.coalesced += 1
+                last[event.type] = index
+                rel = getattr(event, 'rel', None)
+                if rel is not None:
+                    total = moved.get(event.type, (0, 0))
+                    moved[event.type] = (total[0] + rel[0], total[1] + rel[1])
+
+        for index, event in enumerate(events):
+            if event.type in last:
+                # Skip the merged events, and give the last one the whole movement of the frame.
+                if index != last[event.type]:
+                    continue
+                if event.type in moved and moved[event.type] != event.rel:
+                    event = pygame.event.Event(event.type, {**event.dict, 'rel': moved[event.type]})
+            for handler, focus in self.subscribers.get(event.type, ()):
+                if focus is None or focus():
+                    handler(event)
+
+    def stats(self):
+        '''
+        Returns:
+        - A dictionary with the number of events received during the last frame, by event name,
+          and the number of them that were coalesced.
+        '''
+        return {'counts': dict(self.counts), 'coalesced': self.coalesced}
@@ -0,0 +1,18 @@
+import os
+
+def write_atomic(path, parts):
+    '''
+    Writes a file atomically: to a temporary file first, which is flushed to the disk and then
+    replaces the old file. A crash while writing leaves the old file untouched.
+
+    Parameters:
+    - path: The path of the file;
+    - parts: Iterable of bytes-like objects (bytes, memoryviews, NumPy arrays), written in order.
+    '''
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        for part in parts:
+            file.write(part)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
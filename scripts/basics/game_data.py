@@ -0,0 +1,283 @@
+import threading
+import struct
+import queue
+import zlib
+import os
+from scripts.basics.files import write_atomic
+
+class GameData:
+    '''
+    Stores game data (times played, high score, etc.) separately from the settings.
+
+    Values are integers kept in memory; changes are appended to a binary journal by a
+    background thread, and the journal is periodically compacted into an atomic snapshot.
+    Updating a value never touches the disk on the calling thread.
+    '''
+    # Values used when there is no saved data yet.
+    DEFAULTS = {'times_played': 0, 'high_score': 0, 'max_enemies_defeated': 0}
+    # Snapshot header: magic, format version and number of entries.
+    HEADER = struct.Struct('<4sBH')
+    MAGIC = b'GDAT'
+    VERSION = 1
+    VALUE = struct.Struct('<q')
+    CRC = struct.Struct('<I')
+
+    def __init__(self, settings, flush_interval=5.0, compact_after=256):
+        '''
+        Initializes the GameData class, loading the snapshot and replaying the journal.
+
+        Parameters:
+        - settings: An instance of the Settings class, used for the config directory;
+        - flush_interval: Seconds between two automatic flushes (see update);
+        - compact_after: Number of journal records after which the journal is compacted into the snapshot.
+
+        Attributes:
+        - data: The current values, by key;
+        - dirty: Keys changed since the last flush;
+        - error: The last error raised while writing, or None.
+        '''
+        self.snapshot_path = os.path.join(settings.config_dir, 'game_data.dat')
+        self.journal_path = os.path.join(settings.config_dir, 'game_data.journal')
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.data = dict(self.DEFAULTS)
+        # Move the game data out of older settings files.
+        legacy = settings.settings.pop('game_data', None)
+        if legacy is not None and not os.path.exists(self.snapshot_path) and not os.path.exists(self.journal_path):
+            self.data.update(legacy)
+            self.write_snapshot(self.data)
+        if legacy is not None:
+            settings.update_settings()
+        self.data.update(self.read_snapshot())
+        records, valid_size = self.read_journal()
+        # Drop a torn record left by a crash, so new records are appended after the valid ones.
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > valid_size:
+            os.truncate(self.journal_path, valid_size)
+        for key, value in records:
+            self.data[key] = value
+        self.dirty = set()
+        self.elapsed = 0
+        # Values already written to disk, owned by the writer thread.
+        self.saved = dict(self.data)
+        self.journal_records = len(records)
+        # Changes the writer thread failed to write, retried with the next batch.
+        self.unwritten = {}
+        self.error = None
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def get(self, key):
+        '''
+        Returns:
+        - The current value of a key (0 if it was never set).
+        '''
+        return self.data.get(key, 0)
+
+    def set(self, key, value):
+        '''
+        Sets a value in memory. It is written to disk on the next flush.
+
+        Parameters:
+        - key: The name of the value (at most 255 bytes in UTF-8);
+        - value: An integer that fits in 64 bits.
+
+        Raises:
+        - ValueError: If the key or the value cannot be saved.
+        '''
+        value = int(value)
+        self.validate(key, value)
+        self.data[key] = value
+        self.dirty.add(key)
+
+    def increment(self, key, amount=1):
+        '''
+        Adds to a counter in memory (e.g., once per defeated enemy). Costs nothing until flushed.
+
+        Parameters:
+        - key: The name of the counter;
+        - amount: The value to add.
+        '''
+        self.set(key, self.data.get(key, 0) + amount)
+
+    def set_max(self, key, value):
+        '''
+        Keeps the highest value of a key (e.g., the high score).
+
+        Parameters:
+        - key: The name of the value;
+        - value: The candidate value.
+        '''
+        if value > self.data.get(key, 0):
+            self.set(key, value)
+
+    def validate(self, key, value):
+        '''
+        Checks that a value can be written to the journal, so a bad value is refused when it is set
+        instead of failing later on the writer thread.
+
+        Raises:
+        - ValueError: If the key is longer than 255 bytes or the value does not fit in 64 bits.
+        '''
+        if len(key.encode('utf-8')) > 255:
+            raise ValueError(f'Game data key is longer than 255 bytes: {key!r}')
+        if not -2**63 <= value < 2**63:
+            raise ValueError(f'Game data value does not fit in 64 bits: {key!r} = {value}')
+
+    def update(self, dt):
+        '''
+        Flushes the changed values every 'flush_interval' seconds.
+
+        Parameters:
+        - dt: Time elapsed since the last frame, in seconds.
+        '''
+        self.elapsed += dt
+        if self.elapsed >= self.flush_interval:
+            self.elapsed = 0
+            self.flush()
+
+    def flush(self):
+        '''
+        Hands the changed values to the writer thread. Returns immediately.
+        '''
+        if self.dirty:
+            self.writes.put({key: self.data[key] for key in self.dirty})
+            self.dirty = set()
+
+    def close(self):
+        '''
+        Flushes the pending changes, compacts the journal and waits for the writer thread to finish.
+        '''
+        self.flush()
+        self.writes.put(None)
+        self.writer.join()
+
+    def write_loop(self):
+        '''
+        Writer thread: appends each batch of changes to the journal and compacts it when it grows too large.
+        '''
+        while True:
+            changes = self.writes.get()
+            closing = changes is None
+            # Retry the changes that could not be written before.
+            changes = {**self.unwritten, **(changes or {})}
+            self.unwritten = {}
+            written = False
+            try:
+                if changes:
+                    self.append_journal(changes)
+                    self.saved.update(changes)
+                    self.journal_records += len(changes)
+                written = True
+                if self.journal_records >= self.compact_after or (closing and self.journal_records):
+                    self.compact()
+            except (OSError, ValueError, struct.error) as error:
+                # Keep the thread alive and report the error.
+                self.error = error
+                # Retry the batch if the disk failed (e.g., it is full); a value that cannot be encoded is dropped.
+                if not written and isinstance(error, OSError):
+                    self.unwritten = changes
+            if closing:
+                return
+
+    def compact(self):
+        '''
+        Replaces the snapshot with the saved values and empties the journal.
+        The snapshot is written first, so a crash in between only replays values that are already in it.
+        '''
+        self.write_snapshot(self.saved)
+        open(self.journal_path, 'wb').close()
+        self.journal_records = 0
+
+    def encode_entry(self, key, value):
+        '''
+        Returns:
+        - The bytes of one entry: key length, UTF-8 key and 64-bit value.
+        '''
+        key = key.encode('utf-8')
+        return bytes((len(key),)) + key + self.VALUE.pack(value)
+
+    def append_journal(self, changes):
+        '''
+        Appends one record per changed value to the journal; each record ends with its CRC32.
+
+        Parameters:
+        - changes: A dictionary with the new values.
+        '''
+        records = b''
+        for key, value in changes.items():
+            entry = self.encode_entry(key, value)
+            records += entry + self.CRC.pack(zlib.crc32(entry))
+        with open(self.journal_path, 'ab') as file:
+            size = file.tell()
+            try:
+                file.write(records)
+                file.flush()
+                os.fsync(file.fileno())
+            except OSError:
+                # Remove a partly written batch, so the next records are not appended after a torn one.
+                file.truncate(size)
+                raise
+
+    def read_journal(self):
+        '''
+        Reads the journal records, stopping at the first incomplete or corrupted record
+        (e.g., if the game crashed while writing it).
+
+        Returns:
+        - A list of (key, value) tuples, in the order they were written;
+        - The size in bytes of the valid part of the journal.
+        '''
+        if not os.path.exists(self.journal_path):
+            return [], 0
+        with open(self.journal_path, 'rb') as file:
+            journal = file.read()
+        records = []
+        offset = 0
+        while offset < len(journal):
+            end = offset + 1 + journal[offset] + self.VALUE.size
+            if end + self.CRC.size > len(journal):
+                break
+            entry = journal[offset:end]
+            if self.CRC.unpack_from(journal, end)[0] != zlib.crc32(entry):
+                break
+            records.append((entry[1:-self.VALUE.size].decode('utf-8'), self.VALUE.unpack_from(entry, len(entry) - self.VALUE.size)[0]))
+            offset = end + self.CRC.size
+        return records, offset
+
+    def write_snapshot(self, data):
+        '''
+        Writes every value to the snapshot file (see write_atomic).
+
+        Parameters:
+        - data: A dictionary with the values.
+        '''
+        snapshot = self.HEADER.pack(self.MAGIC, self.VERSION, len(data))
+        snapshot += b''.join(self.encode_entry(key, value) for key, value in data.items())
+        snapshot += self.CRC.pack(zlib.crc32(snapshot))
+        write_atomic(self.snapshot_path, [snapshot])
+
+    def read_snapshot(self):
+        '''
+        Reads the snapshot, ignoring it if it is missing, from another format version or corrupted.
+
+        Returns:
+        - A dictionary with the values.
+        '''
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path, 'rb') as file:
+            snapshot = file.read()
+        if len(snapshot) < self.HEADER.size + self.CRC.size or self.CRC.unpack_from(snapshot, len(snapshot) - self.CRC.size)[0] != zlib.crc32(snapshot[:-self.CRC.size]):
+            return {}
+        magic, version, count = self.HEADER.unpack_from(snapshot)
+        if magic != self.MAGIC or version != self.VERSION:
+            return {}
+        data = {}
+        offset = self.HEADER.size
+        for _ in range(count):
+            length = snapshot[offset]
+            key = snapshot[offset + 1:offset + 1 + length].decode('utf-8')
+            data[key] = self.VALUE.unpack_from(snapshot, offset + 1 + length)[0]
+            offset += 1 + length + self.VALUE.size
+        return data
@@ -1,4 +1,5 @@
 import pygame
+from scripts.basics.surfaces import track
 
 class Text:
     def __init__(self, screen, text_color, text_antialias, text_font, text_font_size):
@@ -14,6 +15,9 @@ class Text:
         '''
         # Create a font object with the specified font and size.
         self.text_font = pygame.font.Font(text_font, text_font_size)
+        # Keep the font name and size, used to share rendered surfaces between texts with the same style.
+        self.font_name = text_font
+        self.font_size = text_font_size
         # Store screen, text color, and antialiasing properties.
         self.screen = screen
         self.text_color = text_color
@@ -42,13 +46,13 @@ class Label(Text):
         Renders and draws text on the screen.
 
         Parameters:
-        - text: The string to be displayed;
+        - text: The string to be displayed, or an already rendered surface;
         - pos: Tuple (x, y) indicating the position on the screen;
         - center_w: Boolean to center the text horizontally around pos[0];
         - center_h: Boolean to center the text vertically around pos[1].
         '''
-        # Render the text as a surface with the specified font, color, and antialiasing.
-        text_surf = self.text_font.render(str(text), self.text_antialias, self.text_color)
+        # Render the text as a surface with the specified font, color, and antialiasing (unless it is already rendered).
+        text_surf = text if isinstance(text, pygame.Surface) else track(self.text_font.render(str(text), self.text_antialias, self.text_color))
         # Calculate offsets for centering the text, if enabled.
         center_width = text_surf.get_width() / 2 if center_w else 0
         center_height = text_surf.get_height() / 2 if center_h else 0
@@ -57,6 +61,134 @@ class Label(Text):
         self.screen.blit(text_surf, (pos[0] - center_width, pos[1] - center_height))
         pygame.draw.rect(self.screen, self.border_color, text_rect.inflate(self.border_padding, -self.border_padding).move(0, -self.border_padding/1.5), self.border_width, self.border_radius)
 
+class GlyphText(Text):
+    def __init__(self, screen, text_color=(0,0,0), text_antialias=True, font=None, font_size=100, charset=None):
+        '''
+        Initializes a GlyphText object, inheriting from Text.
+        Renders each glyph once into an atlas, so strings that change every frame
+        (FPS, score, timers) are drawn without rendering text again.
+
+        Parameters:
+        - screen: The Pygame screen where the text will be rendered;
+        - text_color: Color of the text (default is black);
+        - text_antialias: Boolean to enable or disable antialiasing (default is True);
+        - font: Path to the font file or None for the default font;
+        - font_size: Size of the font (default is 100);
+        - charset: The characters to put in the atlas (default is the printable ASCII characters).
+        '''
+        super().__init__(screen, text_color, text_antialias, font, font_size)
+        # Kerning of each pair of glyphs, measured when the pair is first drawn.
+        self.kerning = {}
+        self.build_atlas(charset if charset else [chr(code) for code in range(32, 127)])
+
+    def build_atlas(self, charset):
+        '''
+        Renders every character of the charset side by side into a single atlas surface.
+
+        Parameters:
+        - charset: The characters to render.
+
+        Sets:
+        - atlas: The surface with every glyph, each cropped to its visible pixels;
+        - glyphs: For each character, a tuple (source surface, area, advance, offset), where offset is
+          the position of the visible pixels relative to the pen position, on a common baseline.
+        '''
+        rendered = [(char, self.text_font.render(char, self.text_antialias, self.text_color)) for char in charset]
+        # Crop every glyph to its visible pixels, so fewer pixels are blitted.
+        bounds = [surf.get_bounding_rect() for _, surf in rendered]
+        width = sum(bound.width for bound in bounds)
+        height = max((bound.height for bound in bounds), default=0)
+        self.atlas = track(pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA))
+        x = 0
+        for (_, surf), bound in zip(rendered, bounds):
+            # Copy the glyph with its alpha, without blending it with the empty atlas.
+            self.atlas.blit(surf, (x, 0), bound, special_flags=pygame.BLEND_RGBA_MAX)
+            x += bound.width
+        # Match the display's pixel format for faster blits.
+        if pygame.display.get_surface():
+            self.atlas = track(self.atlas.convert_alpha())
+        self.glyphs = {}
+        x = 0
+        for (char, surf), bound in zip(rendered, bounds):
+            # Glyphs without visible pixels (e.g., space) only advance the pen.
+            source = self.atlas if bound.width else None
+            self.glyphs[char] = (source, pygame.Rect(x, 0, bound.width, bound.height), self.text_font.size(char)[0], (bound.x, bound.y - self.rise(char)))
+            x += bound.width
+
+    def rise(self, char):
+        '''
+        Returns:
+        - How many pixels the rendered glyph extends above the font's ascent.
+        '''
+        metrics = self.text_font.metrics(char)[0]
+        return max(metrics[3] - self.text_font.get_ascent(), 0) if metrics else 0
+
+    def glyph(self, char):
+        '''
+        Returns the glyph of a character, rendering it with pygame.font if it is not in the atlas.
+
+        Returns:
+        - A tuple (source surface, area, advance, offset).
+        '''
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = (track(self.text_font.render(char, self.text_antialias, self.text_color)), None, self.text_font.size(char)[0], (0, -self.rise(char)))
+        return glyph
+
+    def kern(self, pair):
+        '''
+        Returns:
+        - The horizontal adjustment between the two glyphs of a pair, measured once per pair.
+
+        Note:
+        - pygame.font rounds fractional advances over the whole string, so long strings may differ by a pixel.
+        '''
+        kerning = self.kerning.get(pair)
+        if kerning is None:
+            kerning = self.kerning[pair] = self.text_font.size(pair)[0] - self.glyph(pair[0])[2] - self.glyph(pair[1])[2]
+        return kerning
+
+    def measure(self, text):
+        '''
+        Returns:
+        - The width in pixels of a string.
+        '''
+        width = 0
+        previous = ''
+        for char in text:
+            width += self.kern(previous + char) + self.glyph(char)[2] if previous else self.glyph(char)[2]
+            previous = char
+        return width
+
+    def write(self, text, pos, center_w=False, center_h=False):
+        '''
+        Draws text on the screen with a single batch of blits from the atlas.
+
+        Parameters:
+        - text: The string (or value) to be displayed;
+        - pos: Tuple (x, y) indicating the position on the screen;
+        - center_w: Boolean to center the text horizontally around pos[0];
+        - center_h: Boolean to center the text vertically around pos[1].
+        '''
+        text = str(text)
+        # Calculate offsets for centering the text, if enabled.
+        x = pos[0] - (self.measure(text) / 2 if center_w else 0)
+        y = pos[1] - (self.text_font.get_height() / 2 if center_h else 0)
+        glyphs = self.glyphs
+        kerning = self.kerning
+        blits = []
+        previous = ''
+        for char in text:
+            glyph = glyphs.get(char) or self.glyph(char)
+            if previous:
+                pair = previous + char
+                x += kerning[pair] if pair in kerning else self.kern(pair)
+            if glyph[0]:
+                blits.append((glyph[0], (x + glyph[3][0], y + glyph[3][1]), glyph[1]))
+            x += glyph[2]
+            previous = char
+        self.screen.blits(blits, doreturn=False)
+
 class TextButton(Text):
     def __init__(self, screen, text_color, text_antialias, text_font, text_font_size):
         '''
@@ -76,17 +208,17 @@ class TextButton(Text):
         Renders and draws text on the screen, optionally resizing it to fit within a button.
 
         Parameters:
-        - text: The string to be displayed;
+        - text: The string to be displayed, or an already rendered surface;
         - pos: Tuple (x, y) indicating the position on the screen;
         - buttom_width: The maximum width allowed for the text (0 for no limit);
         - center: Boolean to center the text both horizontally and vertically around pos;
         '''
-        # Render the text as a surface.
-        text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
+        # Render the text as a surface (unless it is already rendered).
+        text_surf = text if isinstance(text, pygame.Surface) else track(self.text_font.render(text, self.text_antialias, self.text_color))
         # If the button's width is smaller than the text's width, scale the text down.
         if buttom_width < text_surf.get_width() and buttom_width != 0:
             # Scale the text surface to fit within the button width (subtracting 20 for padding).
-            text_surf = pygame.transform.scale_by(text_surf, (buttom_width-20) / text_surf.get_width())
+            text_surf = track(pygame.transform.scale_by(text_surf, (buttom_width-20) / text_surf.get_width()))
         # Calculate offsets for centering the text, if enabled.
         center_width = text_surf.get_width() / 2 if center else 0
         center_height = text_surf.get_height() / 2 if center else 0
@@ -96,12 +228,12 @@ class TextButton(Text):
 class TextBoxText(Text):
     def __init__(self, screen, text_color, text_antialias, font, font_size):
         super().__init__(screen, text_color, text_antialias, font, font_size)
-        self.text_surf = self.text_font.render('', self.text_antialias, self.text_color)
+        self.text_surf = track(self.text_font.render('', self.text_antialias, self.text_color))
     
     def write(self, text, pos, offset, text_box_size, padding, center_h=True):
-        self.text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
+        self.text_surf = track(self.text_font.render(text, self.text_antialias, self.text_color))
         center_height = text_box_size[1]/3 if center_h else 0
-        clip_surface = pygame.Surface(((text_box_size[0]-(padding*2)), text_box_size[1]), pygame.SRCALPHA)
+        clip_surface = track(pygame.Surface(((text_box_size[0]-(padding*2)), text_box_size[1]), pygame.SRCALPHA))
         clip_surface.fill((0,0,0,0))
         clip_surface.blit(self.text_surf, (-offset, 0))
         self.screen.blit(clip_surface, ((pos[0]+padding), pos[1]+center_height))
@@ -152,13 +284,45 @@ class ElementsAttributes: # Graphical User Interface Basic Attributes
         self.border_thickness = border_thickness
         self.border_color = border_color
 
-        self.box_rect = pygame.Rect(0, 0, size[0], size[1])
+        self.set_geometry(pos, aspect_ratio)
+
+        super().__init__(**kwargs)
+
+    def set_geometry(self, pos, aspect_ratio):
+        '''
+        Moves the element and caches its rects, so hit-testing does no geometry math per frame.
+
+        Parameters:
+        - pos: Tuple (x, y) with the center of the element on the render surface;
+        - aspect_ratio: Tuple with the width and height scaling ratios of the window.
+
+        Sets:
+        - box_rect: The element's rect on the render surface;
+        - shadow_rect: The shadow's rect on the render surface;
+        - window_rect: The element's rect in window coordinates, used for mouse collision.
+        '''
+        self.pos = pos
+        self.aspect_ratio = aspect_ratio
+
+        self.box_rect = pygame.Rect(0, 0, self.size[0], self.size[1])
         self.box_rect.center = (pos[0], pos[1])
 
-        self.shadow_rect = pygame.Rect(0, 0, size[0], size[1])
-        self.shadow_rect.center = (pos[0] + shadow_size[0], pos[1] + shadow_size[1])
+        self.shadow_rect = pygame.Rect(0, 0, self.size[0], self.size[1])
+        self.shadow_rect.center = (pos[0] + self.shadow_size[0], pos[1] + self.shadow_size[1])
 
-        super().__init__(**kwargs)
+        self.window_rect = self.scale_rect(self.box_rect)
+
+    def scale_rect(self, rect):
+        '''
+        Converts a rect from render surface coordinates to window coordinates.
+
+        Parameters:
+        - rect: The rect on the render surface.
+
+        Returns:
+        - A new rect scaled by the aspect ratio.
+        '''
+        return pygame.Rect(rect.x * self.aspect_ratio[0], rect.y * self.aspect_ratio[1], rect.width * self.aspect_ratio[0], rect.height * self.aspect_ratio[1])
 
 class Button(ElementsAttributes):
     def __init__(self,
@@ -214,7 +378,7 @@ class Button(ElementsAttributes):
         Draws the button on the screen.
 
         Parameters:
-        - text: Text to display on the button.
+        - text: Text to display on the button, or an already rendered text surface.
         '''
         if self.visible:
             # Draw the shadow (background).
@@ -238,10 +402,8 @@ class Button(ElementsAttributes):
         if self.visible:
             # Get the current mouse position.
             mouse_pos = pygame.mouse.get_pos()
-            # Adjust the button's clickable area based on the aspect ratio.
-            updated_rect = pygame.Rect(self.box_rect.x * self.aspect_ratio[0], self.box_rect.y * self.aspect_ratio[1], self.box_rect.width * self.aspect_ratio[0], self.box_rect.height * self.aspect_ratio[1])
-            # Check if the mouse is within the updated rectangle.
-            if updated_rect.collidepoint(mouse_pos):
+            # Check if the mouse is within the button's cached window rectangle.
+            if self.window_rect.collidepoint(mouse_pos):
                 # Change the button and text color for hover state.
                 self.box_current_color = self.box_hover_color
                 self.text_color = self.text_hover_color
@@ -293,6 +455,8 @@ class Slider(ElementsAttributes):
         '''
         Initializes the Slider object, which inherits from the Button class.
         '''
+        # Space on either side of the slider line (needed by set_geometry, called from the parent).
+        self.slider_padding = slider_padding
         super().__init__(screen,
                          aspect_ratio,
                          pos, size,
@@ -304,8 +468,6 @@ class Slider(ElementsAttributes):
                          shadow_size=shadow_size,
                          shadow_color=shadow_color,
                          box_transparency=box_transparency)
-        # Space on either side of the slider line.
-        self.slider_padding = slider_padding
         # Size of the pointer (circle).
         self.slider_pointer_radius = slider_pointer_radius
         # Scaling factor for slider values.
@@ -315,6 +477,16 @@ class Slider(ElementsAttributes):
         self.slider_line = slider_line
         self.slider_line_thickness = slider_line_thickness
 
+    def set_geometry(self, pos, aspect_ratio):
+        '''
+        Moves the slider and caches its rects, including the clickable track area.
+
+        Sets:
+        - slider_window_rect: The track (without padding) in window coordinates.
+        '''
+        super().set_geometry(pos, aspect_ratio)
+        self.slider_window_rect = self.scale_rect(pygame.Rect(self.box_rect.x + self.slider_padding, self.box_rect.y, self.box_rect.width - self.slider_padding * 2, self.box_rect.height))
+
     def draw_slider(self):
         '''
         Draws the slider on the screen.
@@ -348,8 +520,8 @@ class Slider(ElementsAttributes):
         '''
         # Get the current mouse position.
         mouse_pos = pygame.mouse.get_pos()
-        # Adjust the slider's clickable area based on the aspect ratio.
-        updated_rect = pygame.Rect((self.box_rect.x + self.slider_padding) * self.aspect_ratio[0], self.box_rect.y * self.aspect_ratio[1], (self.box_rect.width-self.slider_padding * 2) * self.aspect_ratio[0], self.box_rect.height * self.aspect_ratio[1])
+        # The slider's clickable area, already scaled by the aspect ratio.
+        updated_rect = self.slider_window_rect
         # Check if the mouse is within the slider's clickable area.
         if updated_rect.collidepoint(mouse_pos):
             # Check if the left mouse button is pressed.
@@ -461,10 +633,8 @@ class TextBox(ElementsAttributes):
         if self.visible:
             # Get the current mouse position
             mouse_pos = pygame.mouse.get_pos()
-            # Adjust the text box rectangle for different screen aspect ratios
-            updated_rect = pygame.Rect(self.box_rect.x*self.aspect_ratio[0], self.box_rect.y*self.aspect_ratio[1], self.box_rect.width*self.aspect_ratio[0], self.box_rect.height*self.aspect_ratio[1])
-            # If the mouse click is within the text box, set the 'pressed' flag to True
-            if updated_rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
+            # If the mouse click is within the text box (cached window rect), set the 'pressed' flag to True
+            if self.window_rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
                 self.pressed = True
             elif pygame.mouse.get_pressed()[0]:
                 # If mouse is released outside, set the 'pressed' flag to False
@@ -477,20 +647,20 @@ class TextBox(ElementsAttributes):
         Parameters:
         - event: The Pygame event object that contains the keyboard input.
 
-        Updates the user text based on key events (backspace, typing, etc.).
+        Updates the user text based on text input events (typing) and key events (backspace, etc.).
         '''
         # If the text box is pressed, process key events
         if self.pressed:
-            if event.type == pygame.KEYDOWN:
+            if event.type == pygame.TEXTINPUT:
+                # Add the typed text (already composed by the system, e.g., accents) to the user text
+                self.text_input += event.text
+            elif event.type == pygame.KEYDOWN:
                 # Handle backspace key to delete last character
                 if event.key == pygame.K_BACKSPACE:
                     self.text_input = self.text_input[:-1]
                 # Handle enter key to submit (currently does nothing)
                 elif event.key == pygame.K_RETURN:
                     pass
-                else:
-                    # Add the character pressed to the user text
-                    self.text_input += event.unicode
 
 class Panel():
     def __init__(self, screen, aspect_ratio, pos, size=(100,100), color=(128,128,128)):
@@ -500,7 +670,7 @@ class Panel():
         self.velocity = pygame.math.Vector2(0, 0)
         self.acceleration = pygame.math.Vector2(0, 0)
         self.color = color
-        self.panel_surf = pygame.Surface((size[0], size[1]), pygame.SRCALPHA)
+        self.panel_surf = track(pygame.Surface((size[0], size[1]), pygame.SRCALPHA))
         self.acc = -10
     
     def draw(self):
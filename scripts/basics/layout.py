@@ -0,0 +1,229 @@
+import pygame
+
+class Anchor:
+    def __init__(self, child, anchor='center', offset=(0, 0), pivot=None):
+        '''
+        Places a child at a fixed point of the render surface.
+
+        Parameters:
+        - child: A GUI element or another layout node (Row, Column, Grid);
+        - anchor: Name of a pygame.Rect point on the surface ('topleft', 'center', 'midbottom', etc.);
+        - offset: Tuple (x, y) added to the anchor point;
+        - pivot: Name of the point of the child that is aligned to the anchor (defaults to the same as anchor).
+        '''
+        self.child = child
+        self.anchor = anchor
+        self.offset = offset
+        self.pivot = pivot if pivot else anchor
+
+    def measure(self):
+        '''
+        Returns:
+        - The size of the anchored child.
+        '''
+        return measure(self.child)
+
+    def place(self, rect, aspect_ratio):
+        '''
+        Aligns the child's pivot with the anchor point of the given rect.
+
+        Parameters:
+        - rect: The area the anchor is relative to (usually the whole render surface);
+        - aspect_ratio: The window scaling ratios passed down to the elements.
+        '''
+        # Find the anchor point and move it by the offset.
+        point = getattr(rect, self.anchor)
+        point = (point[0] + self.offset[0], point[1] + self.offset[1])
+        # Build the child's rect and align its pivot to the point.
+        child_rect = pygame.Rect((0, 0), self.measure())
+        setattr(child_rect, self.pivot, point)
+        place(self.child, child_rect, aspect_ratio)
+
+class Row:
+    def __init__(self, *children, spacing=0):
+        '''
+        Arranges children from left to right, vertically centered.
+
+        Parameters:
+        - children: GUI elements or layout nodes;
+        - spacing: Gap in pixels between two children.
+        '''
+        self.children = children
+        self.spacing = spacing
+
+    def measure(self):
+        '''
+        Returns:
+        - The total width of the children plus spacing, and the height of the tallest child.
+        '''
+        sizes = [measure(child) for child in self.children]
+        width = sum(size[0] for size in sizes) + self.spacing * max(len(sizes) - 1, 0)
+        height = max((size[1] for size in sizes), default=0)
+        return (width, height)
+
+    def place(self, rect, aspect_ratio):
+        '''
+        Places every child in sequence inside the given rect.
+
+        Parameters:
+        - rect: The area reserved for the row;
+        - aspect_ratio: The window scaling ratios passed down to the elements.
+        '''
+        x = rect.x
+        for child in self.children:
+            size = measure(child)
+            child_rect = pygame.Rect((0, 0), size)
+            child_rect.midleft = (x, rect.centery)
+            place(child, child_rect, aspect_ratio)
+            x += size[0] + self.spacing
+
+class Column:
+    def __init__(self, *children, spacing=0):
+        '''
+        Arranges children from top to bottom, horizontally centered.
+
+        Parameters:
+        - children: GUI elements or layout nodes;
+        - spacing: Gap in pixels between two children.
+        '''
+        self.children = children
+        self.spacing = spacing
+
+    def measure(self):
+        '''
+        Returns:
+        - The width of the widest child, and the total height of the children plus spacing.
+        '''
+        sizes = [measure(child) for child in self.children]
+        width = max((size[0] for size in sizes), default=0)
+        height = sum(size[1] for size in sizes) + self.spacing * max(len(sizes) - 1, 0)
+        return (width, height)
+
+    def place(self, rect, aspect_ratio):
+        '''
+        Places every child in sequence inside the given rect.
+
+        Parameters:
+        - rect: The area reserved for the column;
+        - aspect_ratio: The window scaling ratios passed down to the elements.
+        '''
+        y = rect.y
+        for child in self.children:
+            size = measure(child)
+            child_rect = pygame.Rect((0, 0), size)
+            child_rect.midtop = (rect.centerx, y)
+            place(child, child_rect, aspect_ratio)
+            y += size[1] + self.spacing
+
+class Grid:
+    def __init__(self, *children, columns=2, spacing=(0, 0)):
+        '''
+        Arranges children in a grid of equally sized cells, filled row by row.
+
+        Parameters:
+        - children: GUI elements or layout nodes;
+        - columns: Number of cells per row;
+        - spacing: Tuple (x, y) with the gap in pixels between two cells.
+        '''
+        self.children = children
+        self.columns = columns
+        self.spacing = spacing
+
+    def cell_size(self):
+        '''
+        Returns:
+        - The size of one cell, large enough to fit any child.
+        '''
+        sizes = [measure(child) for child in self.children]
+        return (max((size[0] for size in sizes), default=0), max((size[1] for size in sizes), default=0))
+
+    def measure(self):
+        '''
+        Returns:
+        - The total size of all rows and columns plus spacing.
+        '''
+        cell = self.cell_size()
+        columns = min(self.columns, len(self.children))
+        rows = -(-len(self.children) // self.columns)
+        width = cell[0] * columns + self.spacing[0] * max(columns - 1, 0)
+        height = cell[1] * rows + self.spacing[1] * max(rows - 1, 0)
+        return (width, height)
+
+    def place(self, rect, aspect_ratio):
+        '''
+        Centers every child in its cell inside the given rect.
+
+        Parameters:
+        - rect: The area reserved for the grid;
+        - aspect_ratio: The window scaling ratios passed down to the elements.
+        '''
+        cell = self.cell_size()
+        for index, child in enumerate(self.children):
+            row, column = divmod(index, self.columns)
+            cell_rect = pygame.Rect(rect.x + column * (cell[0] + self.spacing[0]), rect.y + row * (cell[1] + self.spacing[1]), cell[0], cell[1])
+            child_rect = pygame.Rect((0, 0), measure(child))
+            child_rect.center = cell_rect.center
+            place(child, child_rect, aspect_ratio)
+
+class Layout:
+    def __init__(self, surface_size, *children):
+        '''
+        Resolves the geometry of GUI elements once per resolution.
+
+        Parameters:
+        - surface_size: Tuple (width, height) of the render surface the elements are drawn on;
+        - children: Anchors or layout nodes; nodes that are not anchored are centered on the surface.
+
+        Attributes:
+        - resolved: The (surface_size, aspect_ratio) pair of the last resolve, or None.
+        '''
+        self.surface_size = surface_size
+        self.children = children
+        self.resolved = None
+
+    def resolve(self, aspect_ratio):
+        '''
+        Computes the render-space and window-space rects of every element.
+        Does nothing if the layout was already resolved for this aspect ratio.
+
+        Parameters:
+        - aspect_ratio: Tuple with the width and height scaling ratios of the window.
+
+        Returns:
+        - True if the geometry was recomputed, False if the cached geometry is still valid.
+        '''
+        key = (self.surface_size, tuple(aspect_ratio))
+        if self.resolved == key:
+            return False
+        surface_rect = pygame.Rect((0, 0), self.surface_size)
+        for child in self.children:
+            child_rect = pygame.Rect((0, 0), measure(child))
+            child_rect.center = surface_rect.center
+            # Anchors position themselves relative to the whole surface.
+            place(child, surface_rect if isinstance(child, Anchor) else child_rect, aspect_ratio)
+        self.resolved = key
+        return True
+
+    def invalidate(self):
+        '''
+        Forces the next resolve to recompute the geometry (e.g., after adding elements or changing sizes).
+        '''
+        self.resolved = None
+
+def measure(node):
+    '''
+    Returns:
+    - The size of a layout node, or the size of a GUI element.
+    '''
+    if hasattr(node, 'measure'):
+        return node.measure()
+    return tuple(node.size)
+
+def place(node, rect, aspect_ratio):
+    '''
+    Places a layout node inside a rect, or moves a GUI element to the rect's center.
+    '''
+    if hasattr(node, 'place'):
+        node.place(rect, aspect_ratio)
+    else:
+        node.set_geometry(rect.center, aspect_ratio)
@@ -0,0 +1,124 @@
+import pygame
+import numpy as np
+import time
+from collections import OrderedDict
+from scripts.basics.surfaces import track
+
+class Lighting:
+    '''
+    2D lighting post-process.
+    Lights are composited into a low-resolution light buffer using pre-rendered falloff
+    textures, optionally color graded with NumPy, then upscaled and multiplied over the
+    frame with a single blit.
+    '''
+    def __init__(self, size, scale=4, ambient=(40,40,60), grading=None, max_textures=256, color_step=8):
+        '''
+        Initializes the Lighting class.
+
+        Parameters:
+        - size: Tuple (width, height) of the surface the lighting is applied to;
+        - scale: How many times smaller the light buffer is than the surface;
+        - ambient: Light color (RGB tuple) where no light reaches;
+        - grading: Optional 3x3 color matrix applied to the light buffer (e.g., to tint or desaturate);
+        - max_textures: Maximum number of tinted falloff textures kept (least recently used are dropped);
+        - color_step: Light colors are rounded to multiples of this, so flickering lights reuse textures.
+
+        Attributes:
+        - lights: Lights of the current frame, as (pos, radius, color) tuples;
+        - white_falloffs: White falloff textures, by radius;
+        - falloffs: Tinted falloff textures, by (radius, color), from least to most recently used;
+        - timings: Duration in milliseconds of each stage of the last apply.
+        '''
+        self.size = size
+        self.scale = scale
+        self.ambient = ambient
+        self.grading = None if grading is None else np.asarray(grading, dtype=np.float32)
+        self.buffer = track(pygame.Surface((-(-size[0] // scale), -(-size[1] // scale))))
+        self.upscaled = track(pygame.Surface(size))
+        self.max_textures = max_textures
+        self.color_step = color_step
+        self.lights = []
+        self.white_falloffs = {}
+        self.falloffs = OrderedDict()
+        self.timings = {}
+
+    def add_light(self, pos, radius, color=(255,255,255), intensity=1.0):
+        '''
+        Adds a point light to the current frame.
+
+        Parameters:
+        - pos: Tuple (x, y) in surface pixels;
+        - radius: Radius in surface pixels;
+        - color: Light color (RGB tuple);
+        - intensity: Multiplier applied to the color.
+        '''
+        step = self.color_step
+        color = tuple(min(int(channel * intensity / step + 0.5) * step, 255) for channel in color)
+        self.lights.append((pos, max(int(radius / self.scale), 1), color))
+
+    def clear_lights(self):
+        '''
+        Removes every light (e.g., at the start of a frame).
+        '''
+        self.lights.clear()
+
+    def falloff(self, radius, color):
+        '''
+        Returns the falloff texture of a light. The white falloff is rendered once per radius, and tinted
+        copies are kept for the most recently used colors.
+
+        Parameters:
+        - radius: Radius in light buffer pixels;
+        - color: Light color (RGB tuple).
+
+        Returns:
+        - A surface with the light color fading quadratically from the center to the radius.
+        '''
+        key = (radius, color)
+        texture = self.falloffs.get(key)
+        if texture is not None:
+            self.falloffs.move_to_end(key)
+            return texture
+        white = self.white_falloffs.get(radius)
+        if white is None:
+            coordinates = np.arange(radius * 2, dtype=np.float32) - radius + 0.5
+            distance = np.hypot(coordinates[:, None], coordinates[None, :]) / radius
+            strength = np.clip(1 - distance, 0, 1) ** 2
+            pixels = np.repeat((strength * 255)[:, :, None], 3, axis=2).astype(np.uint8)
+            white = self.white_falloffs[radius] = track(pygame.surfarray.make_surface(pixels))
+        # Tint the white falloff with a multiply fill, without NumPy.
+        texture = self.falloffs[key] = track(white.copy())
+        texture.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+        if len(self.falloffs) > self.max_textures:
+            self.falloffs.popitem(last=False)
+        return texture
+
+    def apply(self, surface):
+        '''
+        Lights a surface in place. Records the duration of each stage in timings.
+
+        Parameters:
+        - surface: The surface to light (e.g., the window surface, before it is scaled to the display).
+        '''
+        start = time.perf_counter()
+        # Start from the ambient light.
+        self.buffer.fill(self.ambient)
+        # Add every light with its falloff texture, in a single batch.
+        self.buffer.blits([(self.falloff(radius, color), (pos[0] / self.scale - radius, pos[1] / self.scale - radius), None, pygame.BLEND_RGB_ADD)
+                           for pos, radius, color in self.lights], doreturn=False)
+        composite = time.perf_counter()
+        # Color grade the light buffer.
+        if self.grading is not None:
+            pixels = pygame.surfarray.pixels3d(self.buffer)
+            pixels[...] = np.clip(pixels @ self.grading.T, 0, 255)
+            del pixels
+        grade = time.perf_counter()
+        # Upscale the light buffer and multiply it over the surface.
+        pygame.transform.smoothscale(self.buffer, self.size, self.upscaled)
+        upscale = time.perf_counter()
+        surface.blit(self.upscaled, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        end = time.perf_counter()
+        self.timings = {'composite': (composite - start) * 1000,
+                        'grade': (grade - composite) * 1000,
+                        'upscale': (upscale - grade) * 1000,
+                        'multiply': (end - upscale) * 1000}
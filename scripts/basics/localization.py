@@ -0,0 +1,204 @@
+import pygame
+import threading
+from collections import deque
+import time
+import json
+import os
+from scripts.basics.surfaces import track
+
+class Localization:
+    '''
+    Manages the game texts of each language.
+    Catalogs are stored in separate files and loaded on demand, and the rendered
+    text surfaces of the active and the next language are cached.
+    '''
+    def __init__(self, path):
+        '''
+        Initializes the Localization class.
+
+        Parameters:
+        - path: The base directory path where the 'config' folder is located.
+
+        Attributes:
+        - languages_dir: Directory containing one '<language>.json' catalog per language;
+        - catalogs: Loaded catalogs, by language;
+        - surfaces: Rendered text surfaces, by language and then by (key, suffix, style);
+        - styles: Every text style (font, size, antialias, color) requested so far;
+        - suffixes: Every (key, suffix) variant requested so far (e.g., ('show_fps', ' - ON'));
+        - texts: The catalog of the active language.
+        '''
+        self.languages_dir = os.path.join(path, 'config', 'languages')
+        self.catalogs = {}
+        self.surfaces = {}
+        self.styles = []
+        self.suffixes = []
+        self.fonts = {}
+        # Background threads loading catalogs, by language.
+        self.loaders = {}
+        # Protects the catalogs shared with the loader threads.
+        self.lock = threading.Lock()
+        # Surfaces waiting to be pre-rendered, as (language, key, suffix, style) tuples.
+        self.pending = deque()
+        self.language = None
+        self.next_language = None
+        self.texts = {}
+
+    def available_languages(self):
+        '''
+        Returns:
+        - A sorted list with the name of every language that has a catalog file.
+        '''
+        return sorted(file[:-5] for file in os.listdir(self.languages_dir) if file.endswith('.json'))
+
+    def load_catalog(self, language):
+        '''
+        Loads the catalog of a language from its file, unless it is already in memory.
+
+        Parameters:
+        - language: The language name (e.g., 'en-US').
+
+        Returns:
+        - A dictionary with the texts of the language.
+        '''
+        with self.lock:
+            if language in self.catalogs:
+                return self.catalogs[language]
+        with open(os.path.join(self.languages_dir, f'{language}.json'), 'r', encoding='utf-8') as file:
+            catalog = json.load(file)
+        with self.lock:
+            return self.catalogs.setdefault(language, catalog)
+
+    def prefetch(self, language):
+        '''
+        Loads the catalog of a language on a background thread and queues its texts to be pre-rendered.
+
+        Parameters:
+        - language: The language name.
+        '''
+        with self.lock:
+            if language in self.catalogs or language in self.loaders:
+                return
+        thread = threading.Thread(target=self.load_catalog, args=(language,), daemon=True)
+        self.loaders[language] = thread
+        thread.start()
+
+    def set_language(self, language):
+        '''
+        Makes a language active. Instant if the catalog was prefetched.
+
+        Parameters:
+        - language: The language name.
+
+        Steps:
+        - Loads the catalog (or waits for a prefetch that is still running);
+        - Drops the surfaces of languages other than the active and the next one;
+        - Starts prefetching the next language.
+        '''
+        if language == self.language:
+            return
+        # Wait for a background load of this language, if any.
+        loader = self.loaders.pop(language, None)
+        if loader:
+            loader.join()
+        self.texts = self.load_catalog(language)
+        self.language = language
+        # The next language is the one after the active language in the list of catalogs.
+        languages = self.available_languages()
+        self.next_language = languages[(languages.index(language) + 1) % len(languages)] if language in languages else None
+        # Keep only the cache of the active and the next language in memory.
+        keep = (self.language, self.next_language)
+        with self.lock:
+            self.catalogs = {name: catalog for name, catalog in self.catalogs.items() if name in keep}
+        self.surfaces = {name: surfaces for name, surfaces in self.surfaces.items() if name in keep}
+        self.pending = deque(item for item in self.pending if item[0] in keep)
+        # Pre-render the active language first, then prefetch the next one.
+        self.queue(self.language)
+        if self.next_language and self.next_language != self.language:
+            self.prefetch(self.next_language)
+
+    def queue(self, language):
+        '''
+        Queues every text of a language (and every suffixed variant), in every known style, to be pre-rendered.
+
+        Parameters:
+        - language: The language name, whose catalog must already be loaded.
+        '''
+        with self.lock:
+            catalog = self.catalogs.get(language, {})
+        surfaces = self.surfaces.get(language, {})
+        variants = [(key, '') for key in catalog] + self.suffixes
+        for style in self.styles:
+            for key, suffix in variants:
+                if (key, suffix, style) not in surfaces:
+                    self.pending.append((language, key, suffix, style))
+
+    def get_font(self, style):
+        '''
+        Returns:
+        - A cached font object for the font and size of the style.
+        '''
+        font = self.fonts.get(style[:2])
+        if font is None:
+            font = self.fonts[style[:2]] = pygame.font.Font(style[0], style[1])
+        return font
+
+    def render(self, key, text, suffix=''):
+        '''
+        Returns the surface of a text of the active language, rendering it only once.
+
+        Parameters:
+        - key: The key of the text in the catalog (e.g., 'exit');
+        - text: The Text object (Label, TextButton, ...) whose font and color are used;
+        - suffix: Text added after the catalog text (e.g., ' - ON'). Keep the number of different suffixes small,
+          since each one is cached (and pre-rendered) in every language and style.
+
+        Returns:
+        - The rendered text surface.
+        '''
+        style = (text.font_name, text.font_size, text.text_antialias, tuple(text.text_color))
+        surfaces = self.surfaces.setdefault(self.language, {})
+        surface = surfaces.get((key, suffix, style))
+        if surface is None:
+            surface = surfaces[(key, suffix, style)] = track(self.get_font(style).render(str(self.texts[key]) + suffix, style[2], style[3]))
+            # A new style or variant: pre-render the rest of the texts with it too.
+            new_style = style not in self.styles
+            new_suffix = suffix and (key, suffix) not in self.suffixes
+            if new_style:
+                self.styles.append(style)
+            if new_suffix:
+                self.suffixes.append((key, suffix))
+            if new_style or new_suffix:
+                self.queue(self.language)
+                if self.next_language in self.catalogs:
+                    self.queue(self.next_language)
+        return surface
+
+    def warm(self, budget=0.002):
+        '''
+        Pre-renders queued texts, spending at most 'budget' seconds.
+        Called once per frame so warming never causes a hitch.
+        Rendering stays on the main thread because fonts are not thread-safe.
+
+        Parameters:
+        - budget: Time limit in seconds.
+        '''
+        # Queue the next language once its background load finishes.
+        for language, loader in list(self.loaders.items()):
+            if not loader.is_alive():
+                del self.loaders[language]
+                if language in (self.language, self.next_language):
+                    self.queue(language)
+                else:
+                    # The language changed while it was loading; it is no longer needed.
+                    with self.lock:
+                        self.catalogs.pop(language, None)
+        end = time.perf_counter() + budget
+        while self.pending and time.perf_counter() < end:
+            language, key, suffix, style = self.pending.popleft()
+            with self.lock:
+                catalog = self.catalogs.get(language)
+            if catalog is None or key not in catalog:
+                continue
+            surfaces = self.surfaces.setdefault(language, {})
+            if (key, suffix, style) not in surfaces:
+                surfaces[(key, suffix, style)] = track(self.get_font(style).render(str(catalog[key]) + suffix, style[2], style[3]))
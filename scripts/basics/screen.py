@@ -15,7 +15,8 @@ class Screen():
         - WIDTH: Default screen width (used as a reference for scaling);
         - HEIGHT: Default screen height (used as a reference for scaling);
         - display_surf: The main display surface for rendering;
-        - clock: A Pygame clock object for managing frame timing.
+        - clock: A Pygame clock object for managing frame timing;
+        - post_processes: Stages (e.g., Lighting) applied to each frame before it is scaled to the display.
         '''
         self.settings = settings
         # Default reference dimensions for screen scaling.
@@ -23,9 +24,12 @@ class Screen():
         self.HEIGHT = 720
         # Set up the screen using settings from the Settings instance.
         self.set_screen(self.settings.video_settings['width'], self.settings.video_settings['height'], self.settings.video_settings['vsync'])
-        pygame.mixer.init()
         # Clock to manage frame timing.
         self.clock = pygame.time.Clock()
+        # Post-processing stages, each with an apply(surface) method.
+        self.post_processes = []
+        # Fixed delta time in seconds (e.g., for deterministic tests), or None to use the real frame time.
+        self.fixed_timestep = None
 
     def set_screen(self, width, height, vsync):
         '''
@@ -52,11 +56,13 @@ class Screen():
     
     def scale_screen(self, screen):
         '''
-        Scales the provided surface to fit the display surface.
+        Applies the post-processing stages to the provided surface, then scales it to fit the display surface.
 
         Parameters:
         - screen: The surface to scale.
         '''
+        for stage in self.post_processes:
+            stage.apply(screen)
         pygame.transform.smoothscale(screen, self.display_surf.get_size(), self.display_surf)
     
     def resize_screen(self, width, height, vsync):
@@ -78,7 +84,6 @@ class Screen():
         self.settings.set_settings('video', 'vsync', vsync)
         # Restart the display to apply the new settings.
         pygame.display.quit()
-        pygame.mixer.quit()
         self.set_screen(width, height, vsync)
     
     def delta_time(self):
@@ -86,9 +91,14 @@ class Screen():
         Calculates the time since the last frame.
 
         Sets:
-        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings.
+        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings,
+          or the fixed timestep if one is set (frames are then not limited).
         '''
-        self.dt = self.clock.tick(self.settings.video_settings['fps']) / 1000
+        if self.fixed_timestep:
+            self.clock.tick()
+            self.dt = self.fixed_timestep
+        else:
+            self.dt = self.clock.tick(self.settings.video_settings['fps']) / 1000
     
     def screen_update(self):
         '''
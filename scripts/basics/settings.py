@@ -1,25 +1,36 @@
 import json
 import os
+from scripts.basics.localization import Localization
 
 class Settings():
     '''
     Manages game settings stored in a JSON file.
     Provides functionality to load, update, and retrieve settings.
     '''
-    def __init__(self):
+    # Debug options used when the settings file has no value for them.
+    DEBUG_DEFAULTS = {'startup_trace': False, 'surface_tracking': False}
+
+    def __init__(self, config_dir=None):
         '''
         Initializes the Settings class:
 
         - Defines the path to the settings JSON file;
         - Loads settings from the file into memory;
         - Initializes game-specific settings.
+
+        Parameters:
+        - config_dir: Directory with the writable files (settings.json, game data); defaults to the 'config' directory.
         '''
         # Define the base path of the project directory.
         self.path = os.path.join(os.path.dirname(__file__), '..', '..')
-        # Define the path to the settings.json file located in the 'config' directory.
-        self.file_path = os.path.join(self.path, 'config', 'settings.json')
+        # Define the directory of the settings and save files.
+        self.config_dir = config_dir if config_dir else os.path.join(self.path, 'config')
+        # Define the path to the settings.json file located in the config directory.
+        self.file_path = os.path.join(self.config_dir, 'settings.json')
         # Load the settings from the JSON file.
         self.settings = self.load_settings()
+        # Game texts are kept in separate per-language catalogs, loaded on demand.
+        self.localization = Localization(self.path)
         # Initialize game-specific settings.
         self.game_settings()
     
@@ -42,8 +53,10 @@ class Settings():
         - Audio settings;
         - Language settings;
         - Game text based on the selected language;
-        - Game data;
-        - Controls.
+        - Controls;
+        - Debug options.
+
+        Game data (times played, high score, etc.) is stored separately, see GameData.
         '''
         # Load specific categories of settings.
         # Video-related settings.
@@ -54,11 +67,13 @@ class Settings():
         self.language = self.get_settings('language')
         # Get the current language set.
         self.language_set = self.language['language_set']
-        # Load game texts corresponding to the selected language.
-        self.game_texts = self.language[self.language_set]
+        # Load game texts corresponding to the selected language (instant if the catalog is already cached).
+        self.localization.set_language(self.language_set)
+        self.game_texts = self.localization.texts
         # Load other game-related settings.
-        self.game_data = self.get_settings('game_data')
         self.controls = self.get_settings('keys')
+        # Debug options missing from the file (or a missing 'debug' section) use their defaults.
+        self.debug_settings = {**self.DEBUG_DEFAULTS, **(self.get_settings('debug') or {})}
     
     def update_settings(self):
         '''
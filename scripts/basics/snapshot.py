@@ -0,0 +1,250 @@
+import threading
+import struct
+import queue
+import json
+import time
+import zlib
+import os
+import numpy as np
+from scripts.basics.files import write_atomic
+
+class Snapshots:
+    '''
+    Saves and restores the registered game state (quick-save, checkpoints).
+
+    Each provider returns its state as a dictionary: NumPy arrays are stored as raw,
+    aligned sections of the file, and the other values as compact JSON metadata.
+    The state is captured on the main thread (arrays are copied, which is only a memcpy)
+    and written by a background thread, atomically. When restoring, the file is read into
+    an aligned buffer and the arrays are views into it, without decoding or copying.
+
+    File layout: header (magic, version, metadata size, CRC32 of the rest), JSON metadata,
+    then the array sections, each starting at a multiple of ALIGNMENT bytes.
+    '''
+    HEADER = struct.Struct('<4sB3xII')
+    MAGIC = b'SNAP'
+    VERSION = 1
+    ALIGNMENT = 64
+
+    def __init__(self, settings):
+        '''
+        Initializes the Snapshots class and starts the writer thread.
+
+        Parameters:
+        - settings: An instance of the Settings class; snapshots are saved in the 'saves' folder of its config directory.
+
+        Attributes:
+        - providers: The (save, restore) functions of each registered state, by name;
+        - timings: Duration in milliseconds of the last capture, write and restore;
+        - error: The last error raised while writing a snapshot, or None.
+        '''
+        self.saves_dir = os.path.join(settings.config_dir, 'saves')
+        self.providers = {}
+        self.timings = {}
+        self.error = None
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def register(self, name, save, restore):
+        '''
+        Adds a state to the snapshots (e.g., the map, the player, an array of components).
+
+        Parameters:
+        - name: A unique name for the state;
+        - save: Function returning a dictionary with the state: NumPy arrays of numbers and JSON values
+          (numbers, NumPy scalars, strings, lists, dictionaries);
+        - restore: Function receiving that dictionary back. Its arrays are views into the buffer the snapshot
+          was read into, which belongs to them, so they can be kept as the game's arrays or copied into them (numpy.copyto).
+        '''
+        self.providers[name] = (save, restore)
+
+    def unregister(self, name):
+        '''
+        Removes a state from the snapshots (e.g., when its scene is closed).
+
+        Parameters:
+        - name: The name used in register.
+        '''
+        self.providers.pop(name, None)
+
+    def path(self, name):
+        '''
+        Returns:
+        - The path of a snapshot file.
+        '''
+        return os.path.join(self.saves_dir, name + '.snap')
+
+    def save(self, name):
+        '''
+        Captures the registered state and hands it to the writer thread. Returns right after the capture.
+
+        Parameters:
+        - name: The snapshot name (e.g., 'quicksave', 'checkpoint_1').
+        '''
+        start = time.perf_counter()
+        metadata = {}
+        arrays = []
+        offset = 0
+        for provider, (save, _) in self.providers.items():
+            state = {}
+            sections = {}
+            for key, value in save().items():
+                if isinstance(value, np.ndarray):
+                    # Arrays of Python objects hold pointers, which mean nothing once saved.
+                    if value.dtype.hasobject:
+                        raise TypeError(f"Snapshot state '{provider}.{key}' is an array of Python objects; only arrays of numbers can be saved")
+                    # Copy the array, since the game keeps changing it while the writer thread runs.
+                    array = np.array(value, order='C', copy=True)
+                    # Place the section at an aligned offset from the start of the array data.
+                    offset = -(-offset // self.ALIGNMENT) * self.ALIGNMENT
+                    # Save the full dtype description, so structured arrays keep their field names.
+                    sections[key] = {'dtype': np.lib.format.dtype_to_descr(array.dtype), 'shape': value.shape, 'offset': offset}
+                    arrays.append((offset, array))
+                    offset += array.nbytes
+                else:
+                    state[key] = value
+            metadata[provider] = {'state': state, 'arrays': sections}
+        # Encode the other values now, so later changes to them are not saved.
+        encoded = json.dumps(metadata, separators=(',', ':'), default=self.encode_value).encode('utf-8')
+        self.writes.put((name, encoded, arrays))
+        self.timings['capture'] = (time.perf_counter() - start) * 1000
+
+    def encode_value(self, value):
+        '''
+        Converts the values JSON cannot encode by itself (called by json.dumps).
+
+        Returns:
+        - The Python number or boolean of a NumPy scalar (e.g., numpy.float32(1.5) becomes 1.5).
+
+        Raises:
+        - TypeError: If the value cannot be saved.
+        '''
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f'Snapshot state values must be NumPy arrays or JSON values, not {type(value).__name__}')
+
+    def wait(self):
+        '''
+        Waits until every pending snapshot is written.
+        '''
+        self.writes.join()
+
+    def close(self):
+        '''
+        Writes the pending snapshots and stops the writer thread.
+        '''
+        self.writes.put(None)
+        self.writer.join()
+
+    def write_loop(self):
+        '''
+        Writer thread: writes each captured snapshot.
+        '''
+        while True:
+            snapshot = self.writes.get()
+            if snapshot is None:
+                self.writes.task_done()
+                return
+            try:
+                self.write_snapshot(*snapshot)
+            except Exception as error:
+                # Keep the thread alive (e.g., the disk is full), so later snapshots are still written, and report the error.
+                self.error = error
+            finally:
+                self.writes.task_done()
+
+    def write_snapshot(self, name, encoded, arrays):
+        '''
+        Writes a snapshot file (see write_atomic).
+
+        Parameters:
+        - name: The snapshot name;
+        - encoded: The JSON metadata, with the state of each provider and the description of its arrays;
+        - arrays: List of (offset, array) tuples with the captured arrays.
+        '''
+        start = time.perf_counter()
+        # Build the body (metadata, padding and array sections) and its CRC32, then write it after the header.
+        data_start = -(-(self.HEADER.size + len(encoded)) // self.ALIGNMENT) * self.ALIGNMENT
+        body = [encoded]
+        position = len(encoded) + self.HEADER.size - data_start
+        for offset, array in arrays:
+            body.append(bytes(offset - position))
+            body.append(array)
+            position = offset + array.nbytes
+        crc = 0
+        for part in body:
+            crc = zlib.crc32(part, crc)
+
+        os.makedirs(self.saves_dir, exist_ok=True)
+        write_atomic(self.path(name), [self.HEADER.pack(self.MAGIC, self.VERSION, len(encoded), crc)] + body)
+        self.timings['write'] = (time.perf_counter() - start) * 1000
+
+    def read(self, name):
+        '''
+        Reads a snapshot, ignoring it if it is missing, from another format version or corrupted.
+
+        Parameters:
+        - name: The snapshot name.
+
+        Returns:
+        - A dictionary with the state of each provider (arrays are views into the file buffer), or None.
+        '''
+        # A snapshot of the same name may still be waiting to be written.
+        self.wait()
+        if not os.path.exists(self.path(name)):
+            return None
+        # Read the file straight into an aligned buffer, so the array sections are aligned in memory too.
+        size = os.path.getsize(self.path(name))
+        buffer = np.empty(size + self.ALIGNMENT, dtype=np.uint8)
+        first = -buffer.ctypes.data % self.ALIGNMENT
+        data = buffer[first:first + size]
+        with open(self.path(name), 'rb') as file:
+            if file.readinto(data) != size or size < self.HEADER.size:
+                return None
+        magic, version, metadata_size, crc = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or version != self.VERSION or zlib.crc32(data[self.HEADER.size:]) != crc:
+            return None
+        metadata = json.loads(data[self.HEADER.size:self.HEADER.size + metadata_size].tobytes())
+        data_start = -(-(self.HEADER.size + metadata_size) // self.ALIGNMENT) * self.ALIGNMENT
+        states = {}
+        for provider, saved in metadata.items():
+            state = saved['state']
+            for key, description in saved['arrays'].items():
+                dtype = np.lib.format.descr_to_dtype(self.decode_descr(description['dtype']))
+                shape = tuple(description['shape'])
+                array_start = data_start + description['offset']
+                array_end = array_start + int(np.prod(shape)) * dtype.itemsize
+                state[key] = data[array_start:array_end].view(dtype).reshape(shape)
+            states[provider] = state
+        return states
+
+    def decode_descr(self, descr):
+        '''
+        Returns:
+        - A dtype description read from the JSON metadata, with the (title, name) of its fields turned back into
+          the tuples NumPy expects (JSON stores tuples as lists), including in nested structured dtypes.
+        '''
+        if isinstance(descr, str):
+            return descr
+        return [(tuple(field[0]) if isinstance(field[0], list) else field[0], self.decode_descr(field[1]), *field[2:]) for field in descr]
+
+    def load(self, name):
+        '''
+        Restores the registered state from a snapshot. States without a registered provider are ignored.
+
+        Parameters:
+        - name: The snapshot name.
+
+        Returns:
+        - True if the snapshot was restored, False if it is missing or unreadable.
+        '''
+        start = time.perf_counter()
+        states = self.read(name)
+        if states is None:
+            return False
+        for provider, state in states.items():
+            if provider in self.providers:
+                self.providers[provider][1](state)
+        self.timings['restore'] = (time.perf_counter() - start) * 1000
+        return True
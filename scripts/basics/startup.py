@@ -0,0 +1,63 @@
+import time
+
+class StartupTrace:
+    '''
+    Records how long each phase of the game startup takes.
+    '''
+    def __init__(self):
+        '''
+        Initializes the StartupTrace class and starts the clock.
+
+        Attributes:
+        - phases: List of (name, start, duration) tuples, in seconds since the trace started;
+        - first_frame: Time in seconds until the first frame was shown, or None.
+        '''
+        self.start_time = time.perf_counter()
+        self.phases = []
+        self.first_frame = None
+        self.current = None
+
+    def phase(self, name):
+        '''
+        Ends the current phase (if any) and starts a new one.
+
+        Parameters:
+        - name: The name of the new phase.
+        '''
+        now = time.perf_counter() - self.start_time
+        self.end(now)
+        self.current = (name, now)
+
+    def end(self, now=None):
+        '''
+        Ends the current phase.
+
+        Parameters:
+        - now: The current time since the trace started (measured if not given).
+        '''
+        if now is None:
+            now = time.perf_counter() - self.start_time
+        if self.current:
+            name, start = self.current
+            self.phases.append((name, start, now - start))
+            self.current = None
+
+    def mark_first_frame(self):
+        '''
+        Records that the first frame was shown.
+        '''
+        self.first_frame = time.perf_counter() - self.start_time
+
+    def report(self):
+        '''
+        Returns:
+        - A text timeline with the start and duration of each phase, in milliseconds.
+        '''
+        lines = ['Startup timeline:']
+        for name, start, duration in self.phases:
+            lines.append(f'  {name:<16} start {start * 1000:8.1f} ms   took {duration * 1000:8.1f} ms')
+        if self.first_frame is not None:
+            lines.append(f'  time to first frame: {self.first_frame * 1000:.1f} ms')
+        if self.phases:
+            lines.append(f'  total: {(self.phases[-1][1] + self.phases[-1][2]) * 1000:.1f} ms')
+        return '\n'.join(lines)
@@ -0,0 +1,227 @@
+import pygame
+import threading
+import weakref
+import sys
+import time
+from collections import deque
+
+class SurfaceRecord:
+    def __init__(self, surface, site, frame):
+        '''
+        Describes a tracked surface.
+
+        Parameters:
+        - surface: The tracked surface;
+        - site: Where the surface was created ('file:line in function');
+        - frame: The frame number when it was created.
+        '''
+        self.surface = weakref.ref(surface)
+        self.size = surface.get_size()
+        self.bitsize = surface.get_bitsize()
+        self.flags = surface.get_flags()
+        self.masks = surface.get_masks()
+        # Subsurfaces share the pixels of their parent, so they use no pixel memory of their own.
+        self.bytes = 0 if surface.get_parent() else surface.get_pitch() * surface.get_height()
+        self.site = site
+        self.frame = frame
+        self.created = time.perf_counter()
+        self.released = None
+
+    def lifetime(self):
+        '''
+        Returns:
+        - Seconds the surface has been (or was) alive.
+        '''
+        return (self.released if self.released else time.perf_counter()) - self.created
+
+class SurfaceRegistry:
+    '''
+    Opt-in tracking of surfaces: size, pixel format, creation site and lifetime.
+    Reports pixel memory, surfaces whose format does not match the display (slow blits),
+    sites that allocate surfaces every frame, and snapshots to diff when looking for leaks.
+    When disabled, track() only returns the surface it receives.
+    track() can be called from any thread (e.g., a loader thread baking surfaces).
+    '''
+    def __init__(self, max_released=4096):
+        '''
+        Initializes the SurfaceRegistry class, disabled.
+
+        Parameters:
+        - max_released: Number of records of garbage collected surfaces kept, the oldest are dropped first.
+
+        Attributes:
+        - live: Records of the surfaces still alive, by id;
+        - released: Records of the most recently garbage collected surfaces, with their lifetime;
+        - frame: The current frame number;
+        - frame_sites: Number of surfaces created by each site during the current frame;
+        - streaks: Number of consecutive frames each site has created surfaces in.
+        '''
+        # Guards the records, which are changed by track() on any thread and read by the main thread.
+        self.lock = threading.RLock()
+        # Surfaces garbage collected since the records were last updated, as (key, record, time) tuples.
+        # The finalizers only append here, since they can run at any moment (even while the records are read).
+        self.collected = deque()
+        self.enabled = False
+        self.live = {}
+        self.released = deque(maxlen=max_released)
+        self.frame = 0
+        self.frame_sites = {}
+        self.last_frame_sites = {}
+        self.streaks = {}
+
+    def enable(self):
+        '''
+        Starts tracking the surfaces passed to track().
+        '''
+        self.enabled = True
+
+    def track(self, surface, depth=1):
+        '''
+        Records a new surface, if tracking is enabled.
+
+        Parameters:
+        - surface: The surface that was just created;
+        - depth: How many frames up the call stack the creation site is (1 is the caller).
+
+        Returns:
+        - The same surface, so creation can be wrapped: self.image = track(pygame.Surface(...)).
+        '''
+        if not self.enabled:
+            return surface
+        caller = sys._getframe(depth)
+        site = f'{caller.f_code.co_filename}:{caller.f_lineno} in {caller.f_code.co_name}'
+        key = id(surface)
+        record = SurfaceRecord(surface, site, self.frame)
+        with self.lock:
+            self.live[key] = record
+            self.frame_sites[site] = self.frame_sites.get(site, 0) + 1
+        weakref.finalize(surface, self.release, key, record)
+        return surface
+
+    def release(self, key, record):
+        '''
+        Called when a tracked surface is garbage collected. The record is removed later, by collect.
+        '''
+        self.collected.append((key, record, time.perf_counter()))
+
+    def collect(self):
+        '''
+        Removes the records of the surfaces garbage collected since the last call. Must hold the lock.
+        '''
+        while self.collected:
+            key, record, released = self.collected.popleft()
+            record.released = released
+            self.released.append(record)
+            # The id may already belong to a newer surface.
+            if self.live.get(key) is record:
+                del self.live[key]
+
+    def next_frame(self):
+        '''
+        Closes the current frame. Called once per frame by the main loop.
+        '''
+        if not self.enabled:
+            return
+        with self.lock:
+            self.collect()
+            frame_sites = self.frame_sites
+            self.frame_sites = {}
+            self.frame += 1
+        for site in frame_sites:
+            self.streaks[site] = self.streaks.get(site, 0) + 1
+        for site in list(self.streaks):
+            if site not in frame_sites:
+                del self.streaks[site]
+        self.last_frame_sites = frame_sites
+
+    def memory(self):
+        '''
+        Returns:
+        - The pixel memory in bytes of the tracked surfaces still alive.
+        '''
+        return sum(record.bytes for record in self.snapshot().values())
+
+    def format_mismatches(self):
+        '''
+        Finds live surfaces whose pixel format differs from the display's, which blit on the slow path
+        (usually because convert() or convert_alpha() was not called).
+
+        Returns:
+        - A list of records.
+        '''
+        display = pygame.display.get_surface()
+        if display is None:
+            return []
+        display_masks = display.get_masks()
+        mismatches = []
+        for record in self.snapshot().values():
+            if record.flags & pygame.SRCALPHA:
+                # convert_alpha() gives 32 bits with the display's color channel order.
+                matches = record.bitsize == 32 and record.masks[:3] == display_masks[:3]
+            else:
+                matches = record.bitsize == display.get_bitsize() and record.masks == display_masks
+            if not matches:
+                mismatches.append(record)
+        return mismatches
+
+    def per_frame_sites(self, frames=30):
+        '''
+        Finds the sites that created surfaces in each of the last frames (e.g., rendering text every frame).
+
+        Parameters:
+        - frames: Minimum number of consecutive frames.
+
+        Returns:
+        - A dictionary with the number of surfaces each of those sites created in the last frame.
+        '''
+        return {site: self.last_frame_sites.get(site, 0) for site, streak in self.streaks.items() if streak >= frames}
+
+    def lifetimes(self):
+        '''
+        Summarizes how long the recently garbage collected surfaces lived, by creation site
+        (e.g., a site creating many surfaces that live for a single frame).
+
+        Returns:
+        - A dictionary with the number of released surfaces and their mean lifetime in seconds, by site, most surfaces first.
+        '''
+        with self.lock:
+            self.collect()
+            records = list(self.released)
+        sites = {}
+        for record in records:
+            count, total = sites.get(record.site, (0, 0.0))
+            sites[record.site] = (count + 1, total + record.lifetime())
+        return {site: (count, total / count) for site, (count, total) in sorted(sites.items(), key=lambda item: item[1][0], reverse=True)}
+
+    def snapshot(self):
+        '''
+        Returns:
+        - A copy of the live records, to compare later with diff.
+        '''
+        with self.lock:
+            self.collect()
+            return dict(self.live)
+
+    def diff(self, before, after=None):
+        '''
+        Compares two snapshots to find surfaces that were created and are still alive (possible leaks).
+
+        Parameters:
+        - before: An older snapshot;
+        - after: A newer snapshot (defaults to the current live surfaces).
+
+        Returns:
+        - A dictionary with the number of new surfaces and their bytes, by creation site, largest first.
+        '''
+        if after is None:
+            after = self.snapshot()
+        sites = {}
+        for key, record in after.items():
+            if before.get(key) is not record:
+                count, size = sites.get(record.site, (0, 0))
+                sites[record.site] = (count + 1, size + record.bytes)
+        return dict(sorted(sites.items(), key=lambda item: item[1][1], reverse=True))
+
+# Shared by every module that creates surfaces.
+surfaces = SurfaceRegistry()
+track = surfaces.track
@@ -0,0 +1,130 @@
+import pygame
+from weakref import WeakKeyDictionary
+
+class MaskCache:
+    '''
+    Builds the pixel mask of each surface once, shared by every sprite using that surface.
+    '''
+    def __init__(self):
+        '''
+        Initializes the MaskCache class.
+
+        Attributes:
+        - masks: Masks by surface; an entry is dropped when its surface is garbage collected.
+        '''
+        self.masks = WeakKeyDictionary()
+
+    def get(self, surface):
+        '''
+        Returns the mask of a surface, creating it on first use.
+
+        Parameters:
+        - surface: The sprite image.
+
+        Returns:
+        - The pygame Mask of the surface.
+        '''
+        mask = self.masks.get(surface)
+        if mask is None:
+            mask = self.masks[surface] = pygame.mask.from_surface(surface)
+        return mask
+
+# Shared by every collision sprite, so identical tile images have a single mask.
+mask_cache = MaskCache()
+
+class Collision:
+    '''
+    Pixel-accurate collision in two phases: a rect test selects the candidates (broad phase),
+    then only those are tested with their masks (narrow phase).
+    '''
+    def __init__(self):
+        '''
+        Initializes the Collision class and its counters.
+        '''
+        self.reset_stats()
+
+    def reset_stats(self):
+        '''
+        Resets the counters (e.g., once per frame).
+
+        Sets:
+        - broad_phase: Number of sprite pairs tested with rects;
+        - narrow_phase: Number of pairs whose rects overlapped and were tested with masks;
+        - contacts: Number of pairs whose masks overlapped.
+        '''
+        self.broad_phase = 0
+        self.narrow_phase = 0
+        self.contacts = 0
+
+    def stats(self):
+        '''
+        Returns:
+        - A dictionary with the counters, to check how much the broad phase filters.
+        '''
+        return {'broad_phase': self.broad_phase, 'narrow_phase': self.narrow_phase, 'contacts': self.contacts}
+
+    def mask(self, sprite):
+        '''
+        Returns:
+        - The sprite's mask, or the cached mask of its image if it has none.
+        '''
+        mask = getattr(sprite, 'mask', None)
+        return mask if mask is not None else mask_cache.get(sprite.image)
+
+    def overlap(self, sprite, other):
+        '''
+        Tests two sprites with their masks (narrow phase).
+
+        Returns:
+        - True if a visible pixel of each sprite overlaps.
+        '''
+        self.narrow_phase += 1
+        offset = (int(other.rect.x - sprite.rect.x), int(other.rect.y - sprite.rect.y))
+        if self.mask(sprite).overlap(self.mask(other), offset) is None:
+            return False
+        self.contacts += 1
+        return True
+
+    def collide(self, sprite, group):
+        '''
+        Finds the sprites of a group that touch a sprite.
+
+        Parameters:
+        - sprite: The sprite to test (e.g., the player);
+        - group: The sprites to test against (e.g., the collision sprites of the map).
+
+        Returns:
+        - A list with the touching sprites.
+        '''
+        others = [other for other in group if other is not sprite]
+        self.broad_phase += len(others)
+        candidates = sprite.rect.collidelistall([other.rect for other in others])
+        return [others[index] for index in candidates if self.overlap(sprite, others[index])]
+
+    def contacts_between(self, group, other_group=None):
+        '''
+        Finds every pair of touching sprites in a single query.
+
+        Parameters:
+        - group: The first group of sprites;
+        - other_group: The second group, or None to find the pairs within the first group.
+
+        Returns:
+        - A list of (sprite, other sprite) tuples.
+        '''
+        sprites = list(group)
+        others = sprites if other_group is None else list(other_group)
+        rects = [other.rect for other in others]
+        pairs = []
+        for index, sprite in enumerate(sprites):
+            if other_group is None:
+                # Within a single group, test each pair only once.
+                self.broad_phase += len(others) - index - 1
+                candidates = [candidate for candidate in sprite.rect.collidelistall(rects) if candidate > index]
+            else:
+                self.broad_phase += len(others)
+                candidates = sprite.rect.collidelistall(rects)
+            for candidate in candidates:
+                if self.overlap(sprite, others[candidate]):
+                    pairs.append((sprite, others[candidate]))
+        return pairs
@@ -1,18 +1,45 @@
 import pygame
+import numpy as np
 from os.path import join
 from pytmx.util_pygame import load_pygame
+from scripts.objects.collision import mask_cache
 
 class Map:
     def __init__(self, game):
         TILE_SIZE = 64
         self.map = load_pygame(join(game.settings.path, '...'))
 
-        for obj in self.map.get_layer_by_name('Objects'):
-            CollisionSprite((obj.x, obj.y), obj.image, game.assets.objects_sprites)
+        self.groups = game.assets.objects_sprites
+        self.objects = [CollisionSprite((obj.x, obj.y), obj.image, self.groups) for obj in self.map.get_layer_by_name('Objects')]
 
-        for x, y, img self.map.get_layer_by_name('Ground').tiles():
+        for x, y, img in self.map.get_layer_by_name('Ground').tiles():
             Sprite((x * TILE_SIZE, y * TILE_SIZE), img, game.assets.groud_sprites)
 
+        # Save the map objects in the quick-save and checkpoint snapshots.
+        game.snapshots.register('map', self.snapshot_state, self.restore_state)
+
+    def snapshot_state(self):
+        '''
+        Returns:
+        - The state of the map objects: their positions and which of them are still alive.
+        '''
+        return {'positions': np.array([sprite.rect.center for sprite in self.objects], dtype=np.float32).reshape(-1, 2),
+                'alive': np.array([sprite.alive() for sprite in self.objects], dtype=bool)}
+
+    def restore_state(self, state):
+        '''
+        Moves the map objects back to their saved positions, and adds or removes them from their groups.
+
+        Parameters:
+        - state: A dictionary returned by snapshot_state.
+        '''
+        for sprite, pos, alive in zip(self.objects, state['positions'].tolist(), state['alive'].tolist()):
+            sprite.rect.center = pos
+            if alive and not sprite.alive():
+                sprite.add(self.groups)
+            elif not alive:
+                sprite.kill()
+
 class Sprite(pygame.sprite.Sprite):
     def __init__(self, pos, surf, groups):
         super().__init__(groups)
@@ -24,4 +51,6 @@ class CollisionSprite(pygame.sprite.Sprite):
         super().__init__(groups)
         self.image = surf
         self.rect = self.image.get_frect(center = pos)
+        # Pixel mask for precise collision, shared by every sprite using the same image.
+        self.mask = mask_cache.get(surf)
 
@@ -0,0 +1,728 @@
+import pygame
+import threading
+import queue
+import base64
+import json
+import zlib
+import os
+import numpy as np
+import xml.etree.ElementTree as ElementTree
+from xml.parsers import expat
+from bisect import bisect_right
+from collections import OrderedDict
+from os.path import join
+from scripts.objects.map import CollisionSprite
+from scripts.basics.files import write_atomic
+from scripts.basics.surfaces import track
+
+class StreamingMap:
+    '''
+    Loads a large .tmx map in square regions, only around the camera.
+
+    The first time a map is loaded, it is indexed into files in the cache directory (see MapIndex).
+    The ground tiles of a region are then read from the index and baked into a single surface on a
+    background thread, and its collision sprites are created when the region arrives. Regions far
+    from the camera are evicted, least recently used first, to keep their memory under a cap.
+
+    Memory does not depend on the size of the world: only the tileset images, the baked regions
+    (under memory_cap) and their sprites stay in memory. Only the 'Ground' layer and the tile objects
+    of the 'Objects' layer are used; the other layers are skipped.
+    '''
+    # Flags Tiled stores in the top bits of a gid.
+    FLIPPED_HORIZONTALLY = 0x80000000
+    FLIPPED_VERTICALLY = 0x40000000
+    FLIPPED_DIAGONALLY = 0x20000000
+    GID_MASK = 0x0FFFFFFF
+
+    def __init__(self, game, file, region_size=16, memory_cap=64 * 1024 * 1024, load_radius=1, lookahead=30):
+        '''
+        Initializes the StreamingMap class, indexing the map if needed, and starts the loader thread.
+
+        Parameters:
+        - game: The Main instance, used for the base path, the cache directory and the sprite groups;
+        - file: The .tmx file, relative to the base path;
+        - region_size: Width and height of a region, in tiles;
+        - memory_cap: Maximum memory in bytes used by the baked regions;
+        - load_radius: Number of regions loaded on each side of the camera's region;
+        - lookahead: Number of frames of camera movement used to predict which regions to prefetch.
+        '''
+        self.game = game
+        cache_name = os.path.splitext(file)[0].replace('/', '_').replace(os.sep, '_')
+        self.index = MapIndex(join(game.settings.path, file), join(game.settings.config_dir, 'cache', cache_name), region_size)
+        self.region_size = region_size
+        self.memory_cap = memory_cap
+        self.load_radius = load_radius
+        self.lookahead = lookahead
+        self.width = self.index.width
+        self.height = self.index.height
+        self.tile_size = (self.index.tilewidth, self.index.tileheight)
+        self.region_pixels = (region_size * self.index.tilewidth, region_size * self.index.tileheight)
+        self.columns = self.index.columns
+        self.rows = self.index.rows
+
+        # Load the tileset images; their size depends on the tilesets, not on the world.
+        self.tilesets = [self.load_tileset(tileset) for tileset in self.index.tilesets]
+        self.firstgids = [tileset['firstgid'] for tileset in self.tilesets]
+        # Tile images by gid (with its flip flags), cut from the tilesets when first used. Owned by the loader thread.
+        self.tiles = {0: None}
+
+        # Loaded regions, from least to most recently used, as key: (surface, sprites).
+        self.regions = OrderedDict()
+        self.memory = 0
+        # Regions requested from the loader thread but not received yet.
+        self.requested = set()
+        # Regions still wanted by the main thread; the loader skips requests that are no longer in it.
+        self.wanted = frozenset()
+        self.requests = queue.Queue()
+        self.loaded = queue.Queue()
+        self.camera = None
+        self.velocity = (0, 0)
+        self.loader = threading.Thread(target=self.load_loop, daemon=True)
+        self.loader.start()
+
+    def load_tileset(self, tileset):
+        '''
+        Loads the images of a tileset.
+
+        Parameters:
+        - tileset: A tileset description from the map index.
+
+        Returns:
+        - The description with 'sheet' (a single image cut into tiles) or 'images' (one image per tile id) set.
+        '''
+        def load(image):
+            surface = pygame.image.load(join(self.index.directory, image['source'])).convert_alpha()
+            if image.get('trans'):
+                surface.set_colorkey(pygame.Color('#' + image['trans'].lstrip('#')))
+            return surface
+
+        tileset = dict(tileset)
+        if 'image' in tileset:
+            tileset['sheet'] = load(tileset['image'])
+        else:
+            tileset['images'] = {int(tile_id): load(image) for tile_id, image in tileset['tiles'].items()}
+        return tileset
+
+    def tile_image(self, gid):
+        '''
+        Returns the image of a tile, cutting it from its tileset and flipping it the first time it is used.
+
+        Parameters:
+        - gid: The tile gid, with its flip flags.
+
+        Returns:
+        - The tile surface, or None for an empty or unknown tile.
+        '''
+        if gid in self.tiles:
+            return self.tiles[gid]
+        image = None
+        index = bisect_right(self.firstgids, gid & self.GID_MASK) - 1
+        if index >= 0:
+            tileset = self.tilesets[index]
+            tile_id = (gid & self.GID_MASK) - tileset['firstgid']
+            if 'images' in tileset:
+                image = tileset['images'].get(tile_id)
+            elif tileset['columns']:
+                width, height = tileset['tilewidth'], tileset['tileheight']
+                rect = pygame.Rect(tileset['margin'] + tile_id % tileset['columns'] * (width + tileset['spacing']),
+                                   tileset['margin'] + tile_id // tileset['columns'] * (height + tileset['spacing']), width, height)
+                if tileset['sheet'].get_rect().contains(rect):
+                    image = tileset['sheet'].subsurface(rect)
+        # Apply the flips the same way pytmx does.
+        if image is not None and gid & self.FLIPPED_DIAGONALLY:
+            image = pygame.transform.flip(pygame.transform.rotate(image, 270), True, False)
+        if image is not None and gid & (self.FLIPPED_HORIZONTALLY | self.FLIPPED_VERTICALLY):
+            image = pygame.transform.flip(image, bool(gid & self.FLIPPED_HORIZONTALLY), bool(gid & self.FLIPPED_VERTICALLY))
+        self.tiles[gid] = image
+        return image
+
+    def region_at(self, pos):
+        '''
+        Returns:
+        - The (column, row) key of the region containing a position in pixels.
+        '''
+        return (int(pos[0] // self.region_pixels[0]), int(pos[1] // self.region_pixels[1]))
+
+    def regions_around(self, region):
+        '''
+        Returns:
+        - The keys of the regions within load_radius of a region, inside the map.
+        '''
+        keys = []
+        for row in range(region[1] - self.load_radius, region[1] + self.load_radius + 1):
+            for column in range(region[0] - self.load_radius, region[0] + self.load_radius + 1):
+                if 0 <= column < self.columns and 0 <= row < self.rows:
+                    keys.append((column, row))
+        return keys
+
+    def update(self, camera):
+        '''
+        Requests the regions around the camera (and where it is heading), receives the loaded
+        regions and evicts distant ones. Called once per frame.
+
+        Parameters:
+        - camera: Tuple (x, y) with the camera center, in map pixels.
+        '''
+        # Estimate the camera movement per frame to prefetch regions ahead of it.
+        if self.camera is not None:
+            self.velocity = (camera[0] - self.camera[0], camera[1] - self.camera[1])
+        self.camera = camera
+        predicted = (camera[0] + self.velocity[0] * self.lookahead, camera[1] + self.velocity[1] * self.lookahead)
+        needed = self.regions_around(self.region_at(camera))
+        prefetch = [key for key in self.regions_around(self.region_at(predicted)) if key not in needed]
+        self.wanted = frozenset(needed + prefetch)
+        for key in needed + prefetch:
+            if key not in self.regions and key not in self.requested:
+                self.requested.add(key)
+                self.requests.put(key)
+
+        # Add the regions loaded by the loader thread.
+        while not self.loaded.empty():
+            key, surface, objects = self.loaded.get()
+            self.requested.discard(key)
+            if surface is None or key in self.regions:
+                continue
+            sprites = [CollisionSprite(pos, image, self.game.assets.objects_sprites) for pos, image in objects]
+            self.regions[key] = (surface, sprites)
+            self.memory += self.region_memory(surface)
+
+        # Mark the regions around the camera as the most recently used.
+        for key in needed:
+            if key in self.regions:
+                self.regions.move_to_end(key)
+        self.evict(self.wanted)
+
+    def region_memory(self, surface):
+        '''
+        Returns:
+        - The memory in bytes used by the pixels of a baked region.
+        '''
+        return surface.get_height() * surface.get_pitch()
+
+    def evict(self, keep):
+        '''
+        Unloads the least recently used regions until the memory is under the cap.
+
+        Parameters:
+        - keep: Regions that must stay loaded (around the camera and where it is heading).
+        '''
+        for key in list(self.regions):
+            if self.memory <= self.memory_cap:
+                break
+            if key in keep:
+                continue
+            surface, sprites = self.regions.pop(key)
+            for sprite in sprites:
+                sprite.kill()
+            self.memory -= self.region_memory(surface)
+
+    def load_loop(self):
+        '''
+        Loader thread: reads and bakes each requested region and sends it back to the main thread.
+        '''
+        self.index.open()
+        try:
+            while True:
+                key = self.requests.get()
+                if key is None:
+                    return
+                # The camera moved away before the region was loaded.
+                if key not in self.wanted:
+                    self.loaded.put((key, None, None))
+                    continue
+                objects = [((obj['x'], obj['y']), self.tile_image(int(obj['gid']))) for obj in self.index.read_objects(key)]
+                self.loaded.put((key, self.bake_region(key), [(pos, image) for pos, image in objects if image]))
+        finally:
+            self.index.close()
+
+    def bake_region(self, key):
+        '''
+        Draws the ground tiles of a region into a single surface.
+
+        Parameters:
+        - key: The (column, row) of the region.
+
+        Returns:
+        - The region surface.
+        '''
+        surface = track(pygame.Surface(self.region_pixels, pygame.SRCALPHA))
+        first_column = key[0] * self.region_size
+        first_row = key[1] * self.region_size
+        count = min(self.region_size, self.width - first_column)
+        tiles = []
+        for row in range(first_row, min(first_row + self.region_size, self.height)):
+            for column, gid in enumerate(self.index.read_ground(row, first_column, count).tolist()):
+                if gid:
+                    image = self.tile_image(gid)
+                    if image:
+                        tiles.append((image, (column * self.tile_size[0], (row - first_row) * self.tile_size[1])))
+        surface.blits(tiles, doreturn=False)
+        return surface
+
+    def draw(self, surface, offset):
+        '''
+        Draws the loaded regions that are visible.
+
+        Parameters:
+        - surface: The surface to draw on;
+        - offset: Tuple (x, y) with the map position of the surface's top-left corner.
+        '''
+        view = pygame.Rect(offset, surface.get_size())
+        surface.blits([(region, (key[0] * self.region_pixels[0] - offset[0], key[1] * self.region_pixels[1] - offset[1]))
+                       for key, (region, _) in self.regions.items()
+                       if view.colliderect((key[0] * self.region_pixels[0], key[1] * self.region_pixels[1]), self.region_pixels)], doreturn=False)
+
+    def close(self):
+        '''
+        Stops the loader thread.
+        '''
+        self.requests.put(None)
+        self.loader.join()
+
+class MapIndex:
+    '''
+    On-disk index of a .tmx map, built once and then read one region at a time, so the
+    map itself is never held in memory. It is rebuilt when the .tmx file or the region size changes.
+
+    Files (the cache path followed by an extension):
+    - .json: map and tile size, tilesets, and the size and modification time of the .tmx file;
+    - .gids: the gids of the 'Ground' layer, 4 bytes per tile, row by row;
+    - .objects: the tile objects of the 'Objects' layer (x, y, gid), sorted by region;
+    - .regions: where the objects of each region start in .objects (one more entry than there are regions).
+    '''
+    OBJECT = np.dtype([('x', '<f8'), ('y', '<f8'), ('gid', '<u4')])
+    OFFSET = np.dtype('<i8')
+    GID = np.dtype('<u4')
+    VERSION = 1
+
+    def __init__(self, tmx_path, cache_path, region_size):
+        '''
+        Initializes the MapIndex class, building the index if it is missing or out of date.
+
+        Parameters:
+        - tmx_path: The .tmx file;
+        - cache_path: Path of the index files, without extension;
+        - region_size: Width and height of a region, in tiles.
+        '''
+        self.tmx_path = tmx_path
+        self.cache_path = cache_path
+        self.directory = os.path.dirname(tmx_path)
+        self.region_size = region_size
+        stat = os.stat(tmx_path)
+        self.source = [stat.st_size, stat.st_mtime_ns, region_size, self.VERSION]
+        info = self.read_info()
+        if info is None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            IndexBuilder(self).build()
+            info = self.read_info()
+        self.width = info['width']
+        self.height = info['height']
+        self.tilewidth = info['tilewidth']
+        self.tileheight = info['tileheight']
+        self.tilesets = info['tilesets']
+        self.columns = -(-self.width // region_size)
+        self.rows = -(-self.height // region_size)
+        self.files = None
+
+    def read_info(self):
+        '''
+        Returns:
+        - The index description, or None if the index is missing or was built from another version of the map.
+        '''
+        try:
+            with open(self.cache_path + '.json', encoding='utf-8') as file:
+                info = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if info.get('source') != self.source or not all(os.path.exists(self.cache_path + extension) for extension in ('.gids', '.objects', '.regions')):
+            return None
+        return info
+
+    def open(self):
+        '''
+        Opens the index files for reading (by the thread that reads the regions).
+        '''
+        self.files = {extension: open(self.cache_path + extension, 'rb') for extension in ('.gids', '.objects', '.regions')}
+
+    def close(self):
+        '''
+        Closes the index files.
+        '''
+        for file in self.files.values():
+            file.close()
+        self.files = None
+
+    def read(self, extension, dtype, first, count):
+        '''
+        Returns:
+        - 'count' items of a dtype, read from an index file starting at item 'first'.
+        '''
+        file = self.files[extension]
+        file.seek(first * dtype.itemsize)
+        return np.frombuffer(file.read(count * dtype.itemsize), dtype=dtype)
+
+    def read_ground(self, row, first_column, count):
+        '''
+        Returns:
+        - The gids of 'count' ground tiles of a row, starting at a column.
+        '''
+        return self.read('.gids', self.GID, row * self.width + first_column, count)
+
+    def read_objects(self, key):
+        '''
+        Returns:
+        - The objects of a region, as an array of (x, y, gid) records.
+        '''
+        start, end = self.read('.regions', self.OFFSET, key[1] * self.columns + key[0], 2).tolist()
+        return self.read('.objects', self.OBJECT, start, end - start)
+
+class IndexBuilder:
+    '''
+    Builds a MapIndex in a single streaming pass over the .tmx file, with expat.
+    The ground gids are decoded and written as their text is read, and the objects are written
+    unsorted and then sorted by region in chunks, so building does not hold the map in memory either.
+    '''
+    CHUNK = 65536
+
+    def __init__(self, index):
+        '''
+        Initializes the IndexBuilder class.
+
+        Parameters:
+        - index: The MapIndex being built.
+        '''
+        self.index = index
+        self.info = {'source': index.source, 'tilesets': []}
+        # Open elements, from the root.
+        self.elements = []
+        # Builds the element tree of an inline tileset (tilesets are small).
+        self.tileset_builder = None
+        self.layer = None
+        self.ground = None
+        self.ground_tiles = 0
+        self.in_objects = False
+        self.objects = []
+        self.object_count = 0
+
+    def build(self):
+        '''
+        Writes the index files, then the .json description last, so an interrupted build is never used.
+        '''
+        path = self.index.cache_path
+        if os.path.exists(path + '.json'):
+            os.remove(path + '.json')
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.text
+        with open(path + '.gids', 'wb') as self.gids, open(path + '.objects.tmp', 'wb') as self.unsorted, open(self.index.tmx_path, 'rb') as file:
+            parser.ParseFile(file)
+            self.flush_objects()
+        if self.ground_tiles != self.info['width'] * self.info['height']:
+            raise ValueError(f"{self.index.tmx_path}: the 'Ground' layer has {self.ground_tiles} tiles instead of {self.info['width'] * self.info['height']}")
+        self.sort_objects()
+        os.remove(path + '.objects.tmp')
+        write_atomic(path + '.json', [json.dumps(self.info).encode('utf-8')])
+
+    def start(self, name, attributes):
+        '''
+        Handles the start of an element (called by expat).
+        '''
+        parent = self.elements[-1] if self.elements else None
+        self.elements.append(name)
+        if self.tileset_builder is not None:
+            self.tileset_builder.start(name, attributes)
+        elif name == 'map':
+            if attributes.get('infinite') == '1':
+                raise ValueError(f'{self.index.tmx_path}: infinite maps cannot be streamed')
+            for key in ('width', 'height', 'tilewidth', 'tileheight'):
+                self.info[key] = int(attributes[key])
+        elif name == 'tileset' and parent == 'map':
+            if 'source' in attributes:
+                # An external .tsx tileset, whose image paths are relative to the .tsx file.
+                source = join(self.index.directory, attributes['source'])
+                self.add_tileset(ElementTree.parse(source).getroot(), int(attributes['firstgid']), os.path.dirname(source))
+            else:
+                self.tileset_builder = ElementTree.TreeBuilder()
+                self.tileset_builder.start(name, attributes)
+        elif name == 'layer':
+            self.layer = attributes.get('name')
+        elif name == 'data' and self.layer == 'Ground':
+            self.ground = self.decoder(attributes.get('encoding'), attributes.get('compression'))
+        elif name == 'chunk':
+            raise ValueError(f'{self.index.tmx_path}: infinite maps cannot be streamed')
+        elif name == 'tile' and parent == 'data' and self.ground is not None:
+            self.ground.add(int(attributes.get('gid', 0)))
+        elif name == 'objectgroup':
+            self.in_objects = attributes.get('name') == 'Objects'
+        elif name == 'object' and self.in_objects and 'gid' in attributes:
+            # Tile objects are positioned by their bottom-left corner; use the top-left, like pytmx.
+            y = float(attributes['y']) - float(attributes.get('height', 0))
+            self.objects.append((float(attributes['x']), y, int(attributes['gid'])))
+            if len(self.objects) >= self.CHUNK:
+                self.flush_objects()
+
+    def end(self, name):
+        '''
+        Handles the end of an element (called by expat).
+        '''
+        self.elements.pop()
+        if self.tileset_builder is not None:
+            self.tileset_builder.end(name)
+            if name == 'tileset' and 'tileset' not in self.elements:
+                element = self.tileset_builder.close()
+                self.tileset_builder = None
+                self.add_tileset(element, int(element.get('firstgid')), self.index.directory)
+        elif name == 'data' and self.ground is not None:
+            self.ground_tiles += self.ground.close()
+            self.ground = None
+        elif name == 'layer':
+            self.layer = None
+        elif name == 'objectgroup':
+            self.in_objects = False
+
+    def text(self, data):
+        '''
+        Handles a piece of element text (called by expat, possibly several times per element).
+        '''
+        if self.ground is not None:
+            self.ground.feed(data)
+
+    def decoder(self, encoding, compression):
+        '''
+        Returns:
+        - A decoder writing the gids of the Ground layer to the .gids file.
+        '''
+        if encoding == 'csv':
+            return CsvDecoder(self.gids)
+        if encoding == 'base64':
+            return Base64Decoder(self.gids, compression)
+        if encoding is None:
+            return TileDecoder(self.gids)
+        raise ValueError(f'{self.index.tmx_path}: unsupported layer encoding {encoding!r}')
+
+    def add_tileset(self, element, firstgid, directory):
+        '''
+        Adds the description of a tileset to the index.
+
+        Parameters:
+        - element: The <tileset> element;
+        - firstgid: The first gid of the tileset in the map;
+        - directory: The directory its image paths are relative to.
+        '''
+        def image_description(image):
+            source = os.path.relpath(join(directory, image.get('source')), self.index.directory)
+            return {'source': source, 'trans': image.get('trans')}
+
+        tileset = {'firstgid': firstgid}
+        image = element.find('image')
+        if image is not None:
+            tileset['image'] = image_description(image)
+            for key in ('tilewidth', 'tileheight', 'spacing', 'margin', 'columns'):
+                tileset[key] = int(element.get(key, 0))
+        else:
+            # A collection of images, one per tile.
+            tileset['tiles'] = {tile.get('id'): image_description(tile.find('image')) for tile in element.iter('tile') if tile.find('image') is not None}
+        self.info['tilesets'].append(tileset)
+        self.info['tilesets'].sort(key=lambda tileset: tileset['firstgid'])
+
+    def flush_objects(self):
+        '''
+        Appends the buffered objects to the unsorted objects file.
+        '''
+        if self.objects:
+            np.array(self.objects, dtype=MapIndex.OBJECT).tofile(self.unsorted)
+            self.object_count += len(self.objects)
+            self.objects = []
+
+    def region_keys(self, objects):
+        '''
+        Returns:
+        - The index (row * columns + column) of the region containing each object.
+        '''
+        columns = -(-self.info['width'] // self.index.region_size)
+        rows = -(-self.info['height'] // self.index.region_size)
+        column = np.clip(objects['x'] // (self.index.region_size * self.info['tilewidth']), 0, columns - 1).astype(np.int64)
+        row = np.clip(objects['y'] // (self.index.region_size * self.info['tileheight']), 0, rows - 1).astype(np.int64)
+        return row * columns + column
+
+    def sort_objects(self):
+        '''
+        Writes the objects sorted by region and the start of each region, with a counting sort
+        done in chunks over memory-mapped files.
+        '''
+        path = self.index.cache_path
+        regions = -(-self.info['width'] // self.index.region_size) * -(-self.info['height'] // self.index.region_size)
+        starts = np.memmap(path + '.regions', dtype=MapIndex.OFFSET, mode='w+', shape=(regions + 1,))
+        if not self.object_count:
+            starts.flush()
+            open(path + '.objects', 'wb').close()
+            return
+        unsorted = np.memmap(path + '.objects.tmp', dtype=MapIndex.OBJECT, mode='r', shape=(self.object_count,))
+        # Count the objects of each region, then turn the counts into start offsets.
+        for first in range(0, self.object_count, self.CHUNK):
+            np.add.at(starts, self.region_keys(unsorted[first:first + self.CHUNK]) + 1, 1)
+        np.cumsum(starts, out=starts)
+        # Place each object after the ones already placed in its region.
+        placed = np.memmap(path + '.placed.tmp', dtype=MapIndex.OFFSET, mode='w+', shape=(regions,))
+        placed[:] = starts[:-1]
+        output = np.memmap(path + '.objects', dtype=MapIndex.OBJECT, mode='w+', shape=(self.object_count,))
+        for first in range(0, self.object_count, self.CHUNK):
+            chunk = unsorted[first:first + self.CHUNK]
+            keys = self.region_keys(chunk)
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            rank = np.arange(len(keys)) - np.searchsorted(keys, keys)
+            output[placed[keys] + rank] = chunk[order]
+            np.add.at(placed, keys, 1)
+        output.flush()
+        starts.flush()
+        del unsorted, placed, output, starts
+        os.remove(path + '.placed.tmp')
+
+class CsvDecoder:
+    '''
+    Writes the gids of a CSV-encoded layer as their text arrives.
+    '''
+    def __init__(self, file):
+        '''
+        Initializes the CsvDecoder class.
+
+        Parameters:
+        - file: The .gids file, open for writing.
+        '''
+        self.file = file
+        self.rest = ''
+        self.count = 0
+
+    def feed(self, text):
+        '''
+        Decodes a piece of the layer text.
+        '''
+        # The last value may continue in the next piece of text.
+        values = (self.rest + text).split(',')
+        self.rest = values.pop()
+        self.write(values)
+
+    def add(self, gid):
+        '''
+        Ignores <tile> elements, which CSV layers do not have.
+        '''
+
+    def write(self, values):
+        '''
+        Writes the gids of a list of CSV values.
+        '''
+        gids = np.array([int(value) for value in values if value.strip()], dtype=MapIndex.GID)
+        gids.tofile(self.file)
+        self.count += len(gids)
+
+    def close(self):
+        '''
+        Returns:
+        - The number of gids written.
+        '''
+        self.write([self.rest])
+        return self.count
+
+class Base64Decoder:
+    '''
+    Writes the gids of a base64-encoded (and optionally zlib or gzip compressed) layer as their text arrives.
+    '''
+    def __init__(self, file, compression):
+        '''
+        Initializes the Base64Decoder class.
+
+        Parameters:
+        - file: The .gids file, open for writing;
+        - compression: None, 'zlib' or 'gzip'.
+
+        Raises:
+        - ValueError: If the compression is not supported (e.g., 'zstd').
+        '''
+        if compression not in (None, 'zlib', 'gzip'):
+            raise ValueError(f'Unsupported layer compression {compression!r}')
+        self.file = file
+        self.rest = ''
+        self.size = 0
+        # wbits 47 accepts both zlib and gzip headers.
+        self.decompressor = zlib.decompressobj(47) if compression else None
+
+    def feed(self, text):
+        '''
+        Decodes a piece of the layer text.
+        '''
+        # Decode whole groups of 4 characters; the rest waits for the next piece of text.
+        text = self.rest + ''.join(text.split())
+        end = len(text) - len(text) % 4
+        self.rest = text[end:]
+        self.write(base64.b64decode(text[:end]))
+
+    def add(self, gid):
+        '''
+        Ignores <tile> elements, which base64 layers do not have.
+        '''
+
+    def write(self, data):
+        '''
+        Decompresses (if needed) and writes decoded bytes.
+        '''
+        if self.decompressor:
+            data = self.decompressor.decompress(data)
+        self.file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        '''
+        Returns:
+        - The number of gids written.
+        '''
+        if self.decompressor:
+            data = self.decompressor.flush()
+            self.file.write(data)
+            self.size += len(data)
+        return self.size // MapIndex.GID.itemsize
+
+class TileDecoder:
+    '''
+    Writes the gids of a layer stored as <tile gid="..."/> elements.
+    '''
+    def __init__(self, file):
+        '''
+        Initializes the TileDecoder class.
+
+        Parameters:
+        - file: The .gids file, open for writing.
+        '''
+        self.file = file
+        self.gids = []
+        self.count = 0
+
+    def feed(self, text):
+        '''
+        Ignores the text between the <tile> elements.
+        '''
+
+    def add(self, gid):
+        '''
+        Buffers the gid of a <tile> element, writing the buffer when it is full.
+        '''
+        self.gids.append(gid)
+        if len(self.gids) >= IndexBuilder.CHUNK:
+            self.write()
+
+    def write(self):
+        '''
+        Writes the buffered gids.
+        '''
+        np.array(self.gids, dtype=MapIndex.GID).tofile(self.file)
+        self.count += len(self.gids)
+        self.gids = []
+
+    def close(self):
+        '''
+        Returns:
+        - The number of gids written.
+        '''
+        self.write()
+        return self.count
@@ -0,0 +1,293 @@
+import os
+# Run every game instance headless; must be set before pygame is imported (also in the worker processes).
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import traceback
+import faulthandler
+import multiprocessing
+
+class ScriptedInput:
+    '''
+    Random but reproducible input for a headless game instance.
+    Posts keyboard events and drives a virtual mouse, since the dummy video driver has no real one.
+    '''
+    def __init__(self, game, rng):
+        '''
+        Initializes the ScriptedInput class and replaces the mouse state functions of pygame
+        (only in the worker process running this instance).
+
+        Parameters:
+        - game: The Main instance receiving the input;
+        - rng: The random.Random instance of the session, so the same seed gives the same input.
+        '''
+        import pygame
+        self.pygame = pygame
+        self.game = game
+        self.rng = rng
+        self.mouse_pos = (0, 0)
+        self.mouse_pressed = False
+        self.held_keys = set()
+        pygame.mouse.get_pos = self.get_pos
+        pygame.mouse.get_pressed = self.get_pressed
+
+    def get_pos(self):
+        '''
+        Returns:
+        - The position of the virtual mouse, in display pixels.
+        '''
+        return self.mouse_pos
+
+    def get_pressed(self, num_buttons=3):
+        '''
+        Returns:
+        - The state of the virtual mouse buttons (only the left button is used).
+        '''
+        return (self.mouse_pressed,) + (False,) * (num_buttons - 1)
+
+    def exit_targets(self):
+        '''
+        Returns:
+        - The rects (in display pixels) the mouse must stay out of, because clicking them ends the game.
+        '''
+        if self.game.game_state == 'menu':
+            # The menu's Exit button.
+            return [self.game.menu.button8.window_rect]
+        return []
+
+    def step(self):
+        '''
+        Posts the input of a single frame.
+        '''
+        pygame = self.pygame
+        rng = self.rng
+        width, height = self.game.screen.display_surf.get_size()
+        # Move the mouse, sometimes jumping to a random point, and press or release its left button.
+        if rng.random() < 0.2:
+            mouse_pos = (rng.randrange(width), rng.randrange(height))
+        else:
+            mouse_pos = (min(max(self.mouse_pos[0] + rng.randint(-20, 20), 0), width - 1),
+                         min(max(self.mouse_pos[1] + rng.randint(-20, 20), 0), height - 1))
+        # Keep the mouse still rather than moving it over a target that ends the game.
+        if not any(rect.collidepoint(mouse_pos) for rect in self.exit_targets()):
+            self.mouse_pos = mouse_pos
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=self.mouse_pos, rel=(0, 0), buttons=(int(self.mouse_pressed), 0, 0)))
+        if rng.random() < 0.1:
+            self.mouse_pressed = not self.mouse_pressed
+            event_type = pygame.MOUSEBUTTONDOWN if self.mouse_pressed else pygame.MOUSEBUTTONUP
+            pygame.event.post(pygame.event.Event(event_type, pos=self.mouse_pos, button=1))
+        # Press and release the bound keys.
+        if rng.random() < 0.3:
+            key = rng.choice(list(self.game.controls.key_bits))
+            if key in self.held_keys:
+                self.held_keys.discard(key)
+                pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode='', scancode=0))
+            else:
+                self.held_keys.add(key)
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+        # Type a character (or a backspace) for the text box, as the system does: a TEXTINPUT event with the text.
+        if rng.random() < 0.2:
+            character = rng.choice('abcxyz ãéç\b')
+            if character == '\b':
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, mod=0, unicode='', scancode=0))
+            else:
+                pygame.event.post(pygame.event.Event(pygame.TEXTINPUT, text=character))
+        # Sometimes lose the window focus.
+        if rng.random() < 0.005:
+            pygame.event.post(pygame.event.Event(pygame.WINDOWFOCUSLOST))
+
+def memory_usage():
+    '''
+    Returns:
+    - The current resident memory of the process in bytes, or None where it cannot be read.
+    '''
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_memory_usage():
+    '''
+    Returns:
+    - The peak resident memory of the process in bytes, or None where it cannot be read.
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def percentile(values, fraction):
+    '''
+    Returns:
+    - The value below which the given fraction of the sorted values falls.
+    '''
+    if not values:
+        return None
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def run_session(seed, frames, timestep):
+    '''
+    Runs a single headless play session. Runs in a worker process.
+
+    Parameters:
+    - seed: Seed of the session's input and of the random module;
+    - frames: Number of frames to run (if the game exits before, a new instance runs the rest);
+    - timestep: Fixed delta time in seconds of every frame.
+
+    Returns:
+    - A dictionary with the session's frame-time and memory statistics, and its crash report (or None).
+    '''
+    faulthandler.enable()
+    import pygame
+    from main import Main
+    random.seed(seed)
+    rng = random.Random(seed)
+    # Give the instance its own copy of the settings, so it can change and save them freely.
+    config_dir = tempfile.mkdtemp(prefix=f'soak_{seed}_')
+    base_config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+    with open(os.path.join(base_config, 'settings.json'), encoding='utf-8') as file:
+        settings = json.load(file)
+    settings['video']['fps'] = 0
+    settings['debug'] = {key: False for key in settings.get('debug', {})}
+    with open(os.path.join(config_dir, 'settings.json'), 'w', encoding='utf-8') as file:
+        json.dump(settings, file, indent=4)
+
+    def close(game):
+        '''
+        Writes the game's pending data and shuts pygame down.
+        '''
+        game.game_data.close()
+        game.snapshots.close()
+        pygame.quit()
+
+    frame_times = []
+    restarts = 0
+    crash = None
+    memory_start = None
+    game = None
+    try:
+        game = Main(config_dir)
+        game.screen.fixed_timestep = timestep
+        scripted_input = ScriptedInput(game, rng)
+        memory_start = memory_usage()
+        while len(frame_times) < frames:
+            scripted_input.step()
+            start = time.perf_counter()
+            game.step()
+            frame_times.append(time.perf_counter() - start)
+            # The game exited (e.g., a quit event): start a new instance to run the rest of the planned frames.
+            if not game.running and len(frame_times) < frames:
+                close(game)
+                game = None
+                restarts += 1
+                game = Main(config_dir)
+                game.screen.fixed_timestep = timestep
+                scripted_input.game = game
+    except Exception:
+        crash = traceback.format_exc()
+    memory_end = memory_usage()
+    try:
+        if game is not None:
+            close(game)
+    except Exception:
+        crash = crash or traceback.format_exc()
+    shutil.rmtree(config_dir, ignore_errors=True)
+
+    frame_times.sort()
+    return {'seed': seed,
+            'planned': frames,
+            'frames': len(frame_times),
+            'restarts': restarts,
+            'mean': sum(frame_times) / len(frame_times) if frame_times else None,
+            'p50': percentile(frame_times, 0.50),
+            'p95': percentile(frame_times, 0.95),
+            'p99': percentile(frame_times, 0.99),
+            'max': frame_times[-1] if frame_times else None,
+            'peak_memory': peak_memory_usage(),
+            'memory_growth': memory_end - memory_start if memory_start is not None and memory_end is not None else None,
+            'crash': crash}
+
+def aggregate(results):
+    '''
+    Combines the statistics of every session.
+
+    Parameters:
+    - results: The dictionaries returned by run_session.
+
+    Returns:
+    - A text report with the distribution of the session statistics and the crashes grouped by their last line.
+    '''
+    def distribution(name, scale, unit):
+        values = sorted(result[name] for result in results if result[name] is not None)
+        if not values:
+            return f'  {name:<14} n/a'
+        return (f'  {name:<14} median {percentile(values, 0.5) * scale:10.2f} {unit}'
+                f'   p95 {percentile(values, 0.95) * scale:10.2f} {unit}   worst {values[-1] * scale:10.2f} {unit}')
+
+    lines = [f'Soak test: {len(results)} sessions, {sum(result["frames"] for result in results)} of '
+             f'{sum(result["planned"] for result in results)} planned frames, '
+             f'{sum(result["restarts"] for result in results)} restarts after the game exited']
+    lines.append('Frame time per session:')
+    for name in ('mean', 'p50', 'p95', 'p99', 'max'):
+        lines.append(distribution(name, 1000, 'ms'))
+    lines.append('Memory per session:')
+    lines.append(distribution('peak_memory', 1 / (1024 * 1024), 'MB'))
+    lines.append(distribution('memory_growth', 1 / (1024 * 1024), 'MB'))
+
+    crashes = {}
+    for result in results:
+        if result['crash']:
+            crashes.setdefault(result['crash'].strip().splitlines()[-1], []).append(result)
+    lines.append(f'Crashes: {sum(len(group) for group in crashes.values())}')
+    for summary, group in sorted(crashes.items(), key=lambda item: len(item[1]), reverse=True):
+        lines.append(f'  {len(group)}x {summary}')
+        lines.append(f'     seeds: {", ".join(str(result["seed"]) for result in group[:10])}')
+        lines.append('     ' + group[0]['crash'].strip().replace('\n', '\n     '))
+    return '\n'.join(lines)
+
+def main():
+    '''
+    Runs many headless play sessions across the CPU cores and prints the combined statistics.
+    '''
+    parser = argparse.ArgumentParser(description='Runs headless play sessions of the game in parallel.')
+    parser.add_argument('--sessions', type=int, default=8, help='number of play sessions')
+    parser.add_argument('--frames', type=int, default=3600, help='frames per session')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--dt', type=float, default=1 / 60, help='fixed timestep in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first session (the others use the next seeds)')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds to wait for a session before reporting it as hung')
+    parser.add_argument('--output', help='also write the results of every session to this JSON file')
+    args = parser.parse_args()
+
+    # Spawn fresh processes (no inherited pygame state); each runs a single session, so a crash cannot affect the next one.
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with context.Pool(args.workers, maxtasksperchild=1) as pool:
+        pending = [(seed, pool.apply_async(run_session, (seed, args.frames, args.dt)))
+                   for seed in range(args.seed, args.seed + args.sessions)]
+        for seed, result in pending:
+            try:
+                results.append(result.get(args.timeout))
+            except multiprocessing.TimeoutError:
+                # A worker that died (e.g., a segfault) or hung never returns its result.
+                results.append({'seed': seed, 'planned': args.frames, 'frames': 0, 'restarts': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None,
+                                'max': None, 'peak_memory': None, 'memory_growth': None,
+                                'crash': f'No result after {args.timeout} s: the worker process hung or died (see its stderr)'})
+    print(aggregate(results))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+if __name__ == '__main__':
+    main()